@@ -1,10 +1,26 @@
 """
 Инициализация приложения tweet-inference-service.
+
+Конфигурация загружается лениво при обращении к __version__, чтобы импорт
+пакета (например, клиента app.client) не требовал config.yaml и не создавал
+файл журнала.
 """
-from app.config.config import config
 
-# Инициализируем логгер
-logger = config.logger
-logger.info("Инициализация tweet-inference-service")
 
-__version__ = config.get('service', 'version')
\ No newline at end of file
+def __getattr__(name):
+    """
+    Лениво возвращает версию сервиса из конфигурации.
+
+    Args:
+        name (str): Имя атрибута модуля.
+
+    Returns:
+        str: Версия сервиса, если запрошен атрибут __version__.
+
+    Raises:
+        AttributeError: Если атрибут не найден.
+    """
+    if name == "__version__":
+        from app.config.config import config
+        return config.get('service', 'version')
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
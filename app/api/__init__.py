@@ -1,57 +1,26 @@
 """
 Инициализация API для tweet-inference-service.
-"""
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-
-from app.api.routes import router
-from app.config.config import config
-
-logger = config.logger
-
-# Создаем экземпляр FastAPI
-app = FastAPI(
-    title="Tweet Inference Service",
-    description="Сервис для предсказания потенциала твитов с использованием модели FLAML",
-    version=config.get('service', 'version'),
-    docs_url="/docs",
-    redoc_url="/redoc"
-)
 
-# Настраиваем CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Добавляем роутер
-app.include_router(router, prefix="/api")
+Приложение FastAPI создаётся в app.api.server и импортируется лениво,
+чтобы схемы из app.api.schemas можно было использовать (например, в клиенте)
+без загрузки моделей и пайплайна признаков.
+"""
 
 
-# Регистрируем событие запуска приложения
-@app.on_event("startup")
-async def startup_event():
+def __getattr__(name):
     """
-    Выполняется при запуске приложения.
-    """
-    logger.info("Запуск API сервиса")
+    Лениво возвращает приложение FastAPI.
 
-    # Проверяем доступность модели
-    try:
-        from app.core.model_loader import model_loader
-        model_loader.load_model()
-        logger.info("Модель успешно загружена")
-    except Exception as e:
-        logger.error(f"Ошибка при загрузке модели: {str(e)}")
+    Args:
+        name (str): Имя атрибута модуля.
 
+    Returns:
+        FastAPI: Экземпляр приложения, если запрошен атрибут app.
 
-# Регистрируем событие завершения работы приложения
-@app.on_event("shutdown")
-async def shutdown_event():
-    """
-    Выполняется при завершении работы приложения.
+    Raises:
+        AttributeError: Если атрибут не найден.
     """
-    logger.info("Завершение работы API сервиса")
\ No newline at end of file
+    if name == "app":
+        from app.api.server import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
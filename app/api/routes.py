@@ -1,18 +1,97 @@
 """
 Модуль с определением маршрутов API для tweet-inference-service.
 """
-from fastapi import APIRouter, HTTPException, Body, Request
-from typing import Dict, Any
+import hmac
+import os
 
-from app.api.schemas import TweetInput, PredictionResponse, ErrorResponse, HealthResponse
+from fastapi import APIRouter, HTTPException, Body, Request, Header, Query, Depends
+from pydantic import ValidationError
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.api.schemas import (
+    TweetInput, PredictionResponse, ErrorResponse, HealthResponse, ProfilingSettings,
+    EvaluationRequest, EvaluationResponse, BatchPredictionResponse
+)
+from app.api.transport import MsgpackRoute
 from app.core.prediction import prediction_service
+from app.core.evaluation import threshold_evaluator
+from app.core.profiling import profiler
+from app.core.memory import memory_manager
+from app.core.drift import drift_monitor
 from app.config.config import config
-from app.utils.helpers import validate_tweet_data, format_error_response, log_api_request, log_api_response
+from app.utils.helpers import (
+    validate_tweet_data, validate_thresholds, format_error_response, log_api_request, log_api_response
+)
 
 logger = config.logger
 
-# Создаем роутер API
-router = APIRouter()
+# Создаем роутер API с поддержкой msgpack
+router = APIRouter(route_class=MsgpackRoute)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Проверяет токен администратора в заголовке X-Admin-Token.
+
+    Токен задаётся переменной окружения, имя которой указано в admin.token_env.
+    Если токен не задан, административные маршруты недоступны.
+
+    Args:
+        x_admin_token (str, optional): Значение заголовка X-Admin-Token.
+
+    Raises:
+        HTTPException: Если токен не задан в окружении (403) или не совпадает (401).
+    """
+    expected = os.environ.get(config.get('admin').get('token_env', 'TWEET_INFERENCE_ADMIN_TOKEN'))
+    if not expected:
+        raise HTTPException(
+            status_code=403,
+            detail=format_error_response("Административные маршруты отключены: токен администратора не задан", 403)
+        )
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), expected.encode()):
+        logger.warning("Отклонён запрос к административному маршруту: неверный токен")
+        raise HTTPException(status_code=401, detail=format_error_response("Неверный токен администратора", 401))
+
+
+# Административные маршруты доступны только с токеном администратора
+admin_router = APIRouter(prefix="/admin", route_class=MsgpackRoute, dependencies=[Depends(require_admin)],
+                         responses={401: {"model": ErrorResponse}, 403: {"model": ErrorResponse}})
+
+
+def _parse_tweet(item: Any) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Проверяет данные одного твита из пакета по схеме TweetInput.
+
+    Args:
+        item (Any): Данные твита из тела запроса.
+
+    Returns:
+        Tuple[Optional[Dict[str, Any]], Optional[str]]: Данные твита и None либо
+            None и сообщение об ошибке валидации.
+    """
+    try:
+        return TweetInput.model_validate(item).dict(), None
+    except ValidationError as e:
+        errors = "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" if error['loc'] else error['msg']
+            for error in e.errors()
+        )
+        return None, f"Невалидные данные твита: {errors}"
+
+
+def _get_tweet_id(item: Any) -> str:
+    """
+    Возвращает идентификатор твита из необработанных данных.
+
+    Args:
+        item (Any): Данные твита из тела запроса.
+
+    Returns:
+        str: Идентификатор твита или 'unknown'.
+    """
+    if isinstance(item, dict) and item.get('id') is not None:
+        return str(item['id'])
+    return 'unknown'
 
 
 @router.get("/health", response_model=HealthResponse, tags=["Служебные"])
@@ -32,14 +111,23 @@ async def health_check():
 
 
 @router.post("/predict", response_model=PredictionResponse, responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}},
-             tags=["Prediction"])
-async def predict(request: Request, tweet: TweetInput = Body(...)):
+             response_model_exclude_none=True, tags=["Prediction"])
+def predict(request: Request, tweet: TweetInput = Body(...),
+            threshold: Optional[List[float]] = Query(None),
+            x_profile: bool = Header(False)):
     """
     Выполняет предсказание для одного твита.
 
+    Обработчик синхронный: FastAPI выполняет его в пуле потоков, поэтому
+    ожидание бюджета времени на извлечение признаков не блокирует цикл событий.
+
     Args:
         request (Request): Объект запроса FastAPI.
         tweet (TweetInput): Данные твита.
+        threshold (List[float], optional): Пороговые значения для классификации
+            (параметр можно повторять). По умолчанию используется порог модели.
+        x_profile (bool): Заголовок X-Profile. Если установлен и разрешён администратором,
+            в ответ добавляется разбивка времени по этапам и профиль стеков вызовов.
 
     Returns:
         PredictionResponse: Результат предсказания.
@@ -60,9 +148,16 @@ async def predict(request: Request, tweet: TweetInput = Body(...)):
         log_api_response("predict", response)
         raise HTTPException(status_code=400, detail=response)
 
+    if not validate_thresholds(threshold):
+        error_msg = "Пороговые значения должны находиться в диапазоне [0, 1]"
+        logger.warning(f"{error_msg}. ID: {tweet.id}")
+        response = format_error_response(error_msg, 400)
+        log_api_response("predict", response)
+        raise HTTPException(status_code=400, detail=response)
+
     try:
         # Выполняем предсказание
-        result = prediction_service.predict(tweet_data)
+        result = prediction_service.predict(tweet_data, thresholds=threshold, profile=x_profile)
         logger.info(f"Предсказание успешно выполнено. Tweet ID: {tweet.id}, вероятность: {result['probability']:.4f}")
         log_api_response("predict", result)
         return result
@@ -75,6 +170,145 @@ async def predict(request: Request, tweet: TweetInput = Body(...)):
         raise HTTPException(status_code=500, detail=response)
 
 
+@router.post("/predict/batch", response_model=BatchPredictionResponse,
+             responses={400: {"model": ErrorResponse}, 413: {"model": ErrorResponse}},
+             response_model_exclude_none=True, tags=["Prediction"])
+def predict_batch(tweets: List[Dict[str, Any]] = Body(...), threshold: Optional[List[float]] = Query(None)):
+    """
+    Выполняет предсказания для пакета твитов за один запрос.
+
+    Допустимый размер пакета уменьшается при нехватке памяти. Слишком большой
+    пакет отклоняется с кодом 413; текущий допустимый размер передаётся
+    в заголовке X-Max-Batch-Size, а время, на которое он действует, -
+    в заголовке Retry-After. Каждый твит проверяется по схеме TweetInput
+    отдельно: невалидные твиты не прерывают обработку пакета и возвращаются
+    как ошибки отдельных элементов с кодом 422.
+
+    Args:
+        tweets (List[Dict[str, Any]]): Данные твитов.
+        threshold (List[float], optional): Пороговые значения для классификации
+            (параметр можно повторять). По умолчанию используется порог модели.
+
+    Returns:
+        BatchPredictionResponse: Результаты предсказаний в порядке входных твитов.
+
+    Raises:
+        HTTPException: Если пакет пуст, слишком велик или пороговые значения невалидны.
+    """
+    logger.info(f"Получен запрос на пакетное предсказание для {len(tweets)} твитов")
+
+    if not tweets:
+        error_msg = "Пакет не содержит твитов"
+        logger.warning(error_msg)
+        raise HTTPException(status_code=400, detail=format_error_response(error_msg, 400))
+
+    max_batch_size = memory_manager.scale_batch_size(config.get('prediction').get('max_batch_size', 64))
+    if len(tweets) > max_batch_size:
+        error_msg = f"Размер пакета не должен превышать {max_batch_size} твитов"
+        logger.warning(f"{error_msg}. Получено: {len(tweets)}")
+        response = format_error_response(error_msg, 413)
+        response["error"]["max_batch_size"] = max_batch_size
+        raise HTTPException(
+            status_code=413,
+            detail=response,
+            headers={
+                "X-Max-Batch-Size": str(max_batch_size),
+                "Retry-After": str(int(memory_manager.check_interval))
+            }
+        )
+
+    if not validate_thresholds(threshold):
+        error_msg = "Пороговые значения должны находиться в диапазоне [0, 1]"
+        raise HTTPException(status_code=400, detail=format_error_response(error_msg, 400))
+
+    results = [None] * len(tweets)
+    valid = []
+    for index, item in enumerate(tweets):
+        tweet_data, error_msg = _parse_tweet(item)
+        if tweet_data is None:
+            logger.warning(f"{error_msg}. Tweet ID: {_get_tweet_id(item)}")
+            results[index] = {"tweet_id": _get_tweet_id(item), **format_error_response(error_msg, 422)}
+        else:
+            valid.append((index, tweet_data))
+
+    predictions = prediction_service.predict_batch([tweet_data for _, tweet_data in valid], thresholds=threshold)
+    for (index, _), prediction in zip(valid, predictions):
+        results[index] = prediction
+    failed = sum(1 for item in results if "error" in item)
+    logger.info(f"Пакетное предсказание выполнено. Успешно: {len(results) - failed}, с ошибками: {failed}")
+    return {"results": results}
+
+
+@router.post("/evaluate", response_model=EvaluationResponse, responses={400: {"model": ErrorResponse}},
+             tags=["Модель"])
+def evaluate_thresholds(evaluation: EvaluationRequest = Body(...)):
+    """
+    Оценивает precision/recall на размеченном наборе твитов для множества порогов.
+
+    Предсказания выполняются один раз, вероятности кэшируются, и метрики для
+    других порогов можно получить через GET /evaluate/{evaluation_id}.
+    Твиты, не прошедшие проверку по схеме TweetInput, исключаются из оценки
+    и перечисляются в failed_tweet_ids.
+
+    Args:
+        evaluation (EvaluationRequest): Размеченные твиты и пороговые значения.
+
+    Returns:
+        EvaluationResponse: Метрики по пороговым значениям.
+
+    Raises:
+        HTTPException: Если набор невалиден или ни один твит не удалось оценить.
+    """
+    logger.info(f"Запрос оценки пороговых значений на {len(evaluation.tweets)} твитах")
+
+    labeled_tweets = []
+    rejected_tweet_ids = []
+    for item in evaluation.tweets:
+        tweet_data, error_msg = _parse_tweet(item.tweet)
+        if tweet_data is None:
+            logger.warning(f"Твит исключён из оценки. {error_msg}. Tweet ID: {_get_tweet_id(item.tweet)}")
+            rejected_tweet_ids.append(_get_tweet_id(item.tweet))
+        else:
+            labeled_tweets.append({"tweet": tweet_data, "label": item.label})
+
+    try:
+        return threshold_evaluator.evaluate(labeled_tweets, evaluation.thresholds, rejected_tweet_ids)
+    except ValueError as e:
+        logger.warning(f"Ошибка при оценке пороговых значений: {str(e)}")
+        raise HTTPException(status_code=400, detail=format_error_response(str(e), 400))
+
+
+@router.get("/evaluate/{evaluation_id}", response_model=EvaluationResponse,
+            responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}},
+            tags=["Модель"])
+async def rescore_thresholds(evaluation_id: str, threshold: Optional[List[float]] = Query(None)):
+    """
+    Пересчитывает метрики для ранее оценённого набора без повторного выполнения предсказаний.
+
+    Args:
+        evaluation_id (str): Идентификатор оценки.
+        threshold (List[float], optional): Пороговые значения (параметр можно повторять).
+
+    Returns:
+        EvaluationResponse: Метрики по пороговым значениям.
+
+    Raises:
+        HTTPException: Если оценка не найдена в кэше.
+    """
+    logger.info(f"Запрос пересчёта метрик. Evaluation ID: {evaluation_id}")
+
+    if not validate_thresholds(threshold):
+        raise HTTPException(
+            status_code=400,
+            detail=format_error_response("Пороговые значения должны находиться в диапазоне [0, 1]", 400)
+        )
+
+    report = threshold_evaluator.rescore(evaluation_id, threshold)
+    if report is None:
+        raise HTTPException(status_code=404, detail=format_error_response(f"Оценка не найдена: {evaluation_id}", 404))
+    return report
+
+
 @router.get("/model/info", tags=["Модель"])
 async def get_model_info():
     """
@@ -90,5 +324,115 @@ async def get_model_info():
 
     return {
         "version": model_info["version"],
-        "threshold": model_info["threshold"]
-    }
\ No newline at end of file
+        "threshold": model_info["threshold"],
+        "load_time_ms": model_info["load_time_ms"],
+        "load_source": model_info["load_source"],
+        "fallback_version": model_info["fallback_version"],
+        "degraded_mode_available": prediction_service.degraded_mode_available
+    }
+
+
+@admin_router.get("/profiling", tags=["Администрирование"])
+async def get_profiling_settings():
+    """
+    Возвращает текущие настройки профилирования.
+
+    Returns:
+        Dict[str, Any]: Настройки профилирования.
+    """
+    logger.info("Запрос настроек профилирования")
+    return profiler.get_settings()
+
+
+@admin_router.post("/profiling", tags=["Администрирование"])
+async def update_profiling_settings(settings: ProfilingSettings = Body(...)):
+    """
+    Изменяет настройки профилирования без перезапуска сервиса.
+
+    Args:
+        settings (ProfilingSettings): Новые настройки профилирования.
+
+    Returns:
+        Dict[str, Any]: Текущие настройки профилирования.
+    """
+    logger.info("Запрос изменения настроек профилирования")
+    return profiler.configure(
+        enabled=settings.enabled,
+        sample_rate=settings.sample_rate,
+        slow_threshold_ms=settings.slow_threshold_ms,
+        allow_profile_header=settings.allow_profile_header
+    )
+
+
+@admin_router.get("/profiling/profiles", tags=["Администрирование"])
+async def get_slow_profiles():
+    """
+    Возвращает профили медленных запросов.
+
+    Returns:
+        List[Dict[str, Any]]: Профили медленных запросов, от новых к старым.
+    """
+    logger.info("Запрос профилей медленных запросов")
+    return profiler.get_profiles()
+
+
+@admin_router.get("/profiling/profiles/{request_id}", responses={404: {"model": ErrorResponse}},
+            tags=["Администрирование"])
+async def get_slow_profile(request_id: str):
+    """
+    Возвращает профиль медленного запроса по его идентификатору.
+
+    Args:
+        request_id (str): Идентификатор запроса.
+
+    Returns:
+        Dict[str, Any]: Профиль запроса.
+
+    Raises:
+        HTTPException: Если профиль не найден.
+    """
+    logger.info(f"Запрос профиля медленного запроса. Request ID: {request_id}")
+
+    profile = profiler.get_profile(request_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=format_error_response(f"Профиль не найден: {request_id}", 404))
+    return profile
+
+
+@admin_router.get("/memory", tags=["Администрирование"])
+async def get_memory_report():
+    """
+    Возвращает отчёт о потреблении памяти компонентами и кэшами сервиса.
+
+    Returns:
+        Dict[str, Any]: RSS процесса, бюджет памяти и оценки по компонентам и кэшам.
+    """
+    logger.info("Запрос отчёта о потреблении памяти")
+    return memory_manager.get_report()
+
+
+@admin_router.get("/drift", tags=["Администрирование"])
+async def get_drift_report():
+    """
+    Возвращает статистики дрейфа признаков и вероятностей относительно эталонного снимка.
+
+    Returns:
+        Dict[str, Any]: PSI и KS по признакам и по вероятностям для каждого типа твита.
+    """
+    logger.info("Запрос отчёта о дрейфе")
+    return drift_monitor.get_report()
+
+
+@admin_router.post("/drift/reference", tags=["Администрирование"])
+def save_drift_reference():
+    """
+    Сохраняет текущие распределения как эталонный снимок рядом с моделью.
+
+    Для признаков, по которым ещё не накоплено данных, остаётся предыдущий
+    эталон; такие признаки перечислены в skipped_features.
+
+    Returns:
+        Dict[str, Any]: Сохранённый эталонный снимок и пропущенные признаки.
+    """
+    logger.info("Запрос сохранения эталонного снимка распределений")
+    return drift_monitor.save_reference()
\ No newline at end of file
@@ -1,7 +1,7 @@
 """
 Модуль с Pydantic-схемами для валидации входных и выходных данных API.
 """
-from typing import Optional
+from typing import Optional, Dict, Any, List
 from pydantic import BaseModel, Field, field_validator, model_validator
 
 
@@ -72,6 +72,14 @@ class TweetInput(BaseModel):
         }
 
 
+class ThresholdClassification(BaseModel):
+    """
+    Схема метки класса при заданном пороговом значении.
+    """
+    threshold: float = Field(..., description="Пороговое значение", ge=0.0, le=1.0)
+    label: int = Field(..., description="Метка класса (1 - положительный, 0 - отрицательный)")
+
+
 class PredictionResponse(BaseModel):
     """
     Схема ответа с результатом предсказания.
@@ -79,6 +87,11 @@ class PredictionResponse(BaseModel):
     request_id: str = Field(..., description="Идентификатор запроса")
     tweet_id: str = Field(..., description="Идентификатор твита")
     probability: float = Field(..., description="Вероятность положительного класса", ge=0.0, le=1.0)
+    degraded: bool = Field(False, description="Предсказание получено резервной моделью в деградированном режиме")
+    classifications: List[ThresholdClassification] = Field(
+        default_factory=list, description="Метки классов для запрошенных пороговых значений"
+    )
+    trace: Optional[Dict[str, Any]] = Field(None, description="Разбивка времени по этапам (при запросе профилирования)")
 
     class Config:
         """
@@ -88,7 +101,11 @@ class PredictionResponse(BaseModel):
             "example": {
                 "request_id": "550e8400-e29b-41d4-a716-446655440000",
                 "tweet_id": "1889728050276823115",
-                "probability": 0.87
+                "probability": 0.87,
+                "degraded": False,
+                "classifications": [
+                    {"threshold": 0.5, "label": 1}
+                ]
             }
         }
 
@@ -113,6 +130,128 @@ class ErrorResponse(BaseModel):
         }
 
 
+class BatchPredictionItem(BaseModel):
+    """
+    Схема результата предсказания для одного твита в пакете.
+    """
+    tweet_id: str = Field(..., description="Идентификатор твита")
+    prediction: Optional[PredictionResponse] = Field(None, description="Результат предсказания")
+    error: Optional[dict] = Field(None, description="Информация об ошибке, если предсказание не выполнено")
+
+
+class BatchPredictionResponse(BaseModel):
+    """
+    Схема ответа с результатами пакетного предсказания.
+
+    Порядок результатов совпадает с порядком твитов в запросе.
+    """
+    results: List[BatchPredictionItem] = Field(..., description="Результаты предсказаний")
+
+    class Config:
+        """
+        Конфигурация схемы.
+        """
+        schema_extra = {
+            "example": {
+                "results": [
+                    {
+                        "tweet_id": "1889728050276823115",
+                        "prediction": {
+                            "request_id": "550e8400-e29b-41d4-a716-446655440000",
+                            "tweet_id": "1889728050276823115",
+                            "probability": 0.87,
+                            "degraded": False,
+                            "classifications": [{"threshold": 0.5, "label": 1}]
+                        }
+                    }
+                ]
+            }
+        }
+
+
+class LabeledTweet(BaseModel):
+    """
+    Схема размеченного твита для оценки пороговых значений.
+    """
+    tweet: Dict[str, Any] = Field(..., description="Данные твита (проверяются по схеме TweetInput отдельно)")
+    label: int = Field(..., description="Истинная метка класса (0 или 1)", ge=0, le=1)
+
+
+class EvaluationRequest(BaseModel):
+    """
+    Схема запроса на оценку пороговых значений на размеченном наборе.
+    """
+    tweets: List[LabeledTweet] = Field(..., description="Размеченные твиты", min_length=1)
+    thresholds: Optional[List[float]] = Field(None, description="Пороговые значения для оценки")
+
+    @field_validator('thresholds')
+    def validate_thresholds(cls, v):
+        """
+        Валидирует пороговые значения.
+
+        Args:
+            v: Список пороговых значений.
+
+        Returns:
+            Optional[List[float]]: Валидированное значение.
+
+        Raises:
+            ValueError: Если порог вне диапазона [0, 1].
+        """
+        if v is not None and any(not 0.0 <= t <= 1.0 for t in v):
+            raise ValueError("Пороговые значения должны находиться в диапазоне [0, 1]")
+        return v
+
+
+class ThresholdMetrics(BaseModel):
+    """
+    Схема метрик классификации при заданном пороговом значении.
+    """
+    threshold: float = Field(..., description="Пороговое значение")
+    tp: int = Field(..., description="Истинно положительные")
+    fp: int = Field(..., description="Ложно положительные")
+    fn: int = Field(..., description="Ложно отрицательные")
+    tn: int = Field(..., description="Истинно отрицательные")
+    precision: Optional[float] = Field(None, description="Точность (None, если нет положительных предсказаний)")
+    recall: Optional[float] = Field(None, description="Полнота (None, если нет положительных меток)")
+    f1: float = Field(..., description="F1-мера")
+
+
+class EvaluationResponse(BaseModel):
+    """
+    Схема ответа с метриками по пороговым значениям.
+    """
+    evaluation_id: str = Field(..., description="Идентификатор оценки для пересчёта по кэшу")
+    n_tweets: int = Field(..., description="Количество оценённых твитов")
+    n_positive: int = Field(..., description="Количество положительных меток")
+    failed_tweet_ids: List[str] = Field(..., description="Твиты, исключённые из оценки из-за ошибок")
+    metrics: List[ThresholdMetrics] = Field(..., description="Метрики по пороговым значениям")
+
+
+class ProfilingSettings(BaseModel):
+    """
+    Схема настроек профилирования запросов.
+    """
+    enabled: Optional[bool] = Field(None, description="Снимать стеки вызовов для всех запросов")
+    sample_rate: Optional[float] = Field(None, description="Доля запросов, для которых снимаются стеки вызовов",
+                                         ge=0.0, le=1.0)
+    slow_threshold_ms: Optional[float] = Field(None, description="Порог длительности медленного запроса в мс", ge=0.0)
+    allow_profile_header: Optional[bool] = Field(None, description="Учитывать заголовок X-Profile в запросах")
+
+    class Config:
+        """
+        Конфигурация схемы.
+        """
+        schema_extra = {
+            "example": {
+                "enabled": False,
+                "sample_rate": 0.01,
+                "slow_threshold_ms": 1000,
+                "allow_profile_header": False
+            }
+        }
+
+
 class HealthResponse(BaseModel):
     """
     Схема ответа для проверки работоспособности сервиса.
@@ -0,0 +1,189 @@
+"""
+Модуль с бинарным транспортом msgpack для маршрутов API.
+
+Маршруты принимают тело запроса в msgpack при Content-Type: application/msgpack
+и возвращают ответ в msgpack, если клиент предпочёл его JSON в заголовке Accept.
+Валидация и сериализация выполняются теми же схемами, что и для JSON.
+"""
+from typing import Any, Callable, List, Tuple
+
+import msgpack
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+# Поддерживаемые типы содержимого msgpack
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# Типы содержимого, которые означают JSON при согласовании формата ответа
+JSON_MEDIA_TYPES = ("application/json", "application/*", "*/*")
+
+
+def parse_media_type(header_value: str) -> str:
+    """
+    Извлекает тип содержимого из заголовка без параметров.
+
+    Args:
+        header_value (str): Значение заголовка Content-Type.
+
+    Returns:
+        str: Тип содержимого в нижнем регистре, например application/json.
+    """
+    return header_value.split(";", 1)[0].strip().lower()
+
+
+def parse_accept(header_value: str) -> List[Tuple[str, float]]:
+    """
+    Разбирает заголовок Accept в список типов с весами q.
+
+    Невалидный вес считается равным 0, то есть тип не принимается.
+
+    Args:
+        header_value (str): Значение заголовка Accept.
+
+    Returns:
+        List[Tuple[str, float]]: Пары (тип содержимого, вес) в порядке следования.
+    """
+    accepted = []
+    for part in header_value.split(","):
+        media_type, *params = part.split(";")
+        media_type = media_type.strip().lower()
+        if not media_type:
+            continue
+
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    quality = 0.0
+        accepted.append((media_type, quality))
+
+    return accepted
+
+
+def is_msgpack(header_value: str) -> bool:
+    """
+    Проверяет, передано ли тело запроса в формате msgpack.
+
+    Args:
+        header_value (str): Значение заголовка Content-Type.
+
+    Returns:
+        bool: True, если тип содержимого - msgpack.
+    """
+    return parse_media_type(header_value) in MSGPACK_MEDIA_TYPES
+
+
+def prefers_msgpack(header_value: str) -> bool:
+    """
+    Проверяет, предпочитает ли клиент ответ в формате msgpack.
+
+    Сравниваются наибольшие веса q для msgpack и JSON (включая */*);
+    при равных весах и при отсутствии заголовка выбирается JSON.
+
+    Args:
+        header_value (str): Значение заголовка Accept.
+
+    Returns:
+        bool: True, если вес msgpack строго больше веса JSON.
+    """
+    msgpack_quality = 0.0
+    json_quality = 0.0
+    for media_type, quality in parse_accept(header_value):
+        if media_type in MSGPACK_MEDIA_TYPES:
+            msgpack_quality = max(msgpack_quality, quality)
+        elif media_type in JSON_MEDIA_TYPES:
+            json_quality = max(json_quality, quality)
+
+    return msgpack_quality > json_quality
+
+
+class MsgpackResponse(Response):
+    """
+    Ответ, сериализованный в msgpack.
+    """
+    media_type = "application/msgpack"
+
+    def render(self, content: Any) -> bytes:
+        """
+        Сериализует содержимое ответа.
+
+        Args:
+            content (Any): Содержимое, приведённое к JSON-совместимому виду.
+
+        Returns:
+            bytes: Содержимое в формате msgpack.
+        """
+        return msgpack.packb(content, use_bin_type=True)
+
+
+class MsgpackRequest(Request):
+    """
+    Запрос с телом в формате msgpack.
+
+    FastAPI получает разобранное тело через метод json(), поэтому
+    он переопределён для декодирования msgpack.
+    """
+
+    async def json(self) -> Any:
+        """
+        Декодирует тело запроса из msgpack.
+
+        Returns:
+            Any: Разобранное тело запроса.
+        """
+        if not hasattr(self, "_json"):
+            self._json = msgpack.unpackb(await self.body(), raw=False)
+        return self._json
+
+
+class MsgpackRoute(APIRoute):
+    """
+    Маршрут API с поддержкой msgpack через согласование содержимого.
+
+    Для каждого маршрута создаются два обработчика, отличающиеся только
+    классом ответа; обработчик выбирается по весам q в заголовке Accept.
+    """
+
+    def get_route_handler(self) -> Callable:
+        """
+        Возвращает обработчик запроса с выбором формата по заголовкам.
+
+        Returns:
+            Callable: Обработчик запроса.
+        """
+        json_handler = super().get_route_handler()
+
+        response_class = self.response_class
+        self.response_class = MsgpackResponse
+        try:
+            msgpack_handler = super().get_route_handler()
+        finally:
+            self.response_class = response_class
+
+        async def route_handler(request: Request) -> Response:
+            if is_msgpack(request.headers.get("content-type", "")):
+                # FastAPI разбирает тело только для JSON, поэтому подменяем тип содержимого
+                scope = dict(request.scope)
+                scope["headers"] = [
+                    (name, b"application/json" if name == b"content-type" else value)
+                    for name, value in request.scope["headers"]
+                ]
+                request = MsgpackRequest(scope, request.receive)
+
+            if prefers_msgpack(request.headers.get("accept", "")):
+                response = await msgpack_handler(request)
+            else:
+                response = await json_handler(request)
+
+            # Формат ответа зависит от Accept, поэтому кэши должны учитывать этот заголовок
+            vary = response.headers.get("vary")
+            if not vary:
+                response.headers["vary"] = "Accept"
+            elif "accept" not in [value.strip().lower() for value in vary.split(",")]:
+                response.headers["vary"] = f"{vary}, Accept"
+            return response
+
+        return route_handler
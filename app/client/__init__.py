@@ -0,0 +1,6 @@
+"""
+Асинхронный клиент для tweet-inference-service.
+"""
+from app.client.client import TweetInferenceClient, PredictionError, BatchTooLargeError
+
+__all__ = ["TweetInferenceClient", "PredictionError", "BatchTooLargeError"]
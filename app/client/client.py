@@ -0,0 +1,398 @@
+"""
+Модуль с асинхронным клиентом tweet-inference-service.
+"""
+import asyncio
+import random
+from typing import Dict, Any, List, Optional, Union
+
+import httpx
+import msgpack
+
+from app.api.schemas import TweetInput, PredictionResponse, BatchPredictionItem
+
+# Коды ответа, при которых запрос повторяется
+RETRY_STATUS_CODES = {429, 503}
+
+# Ошибки соединения, при которых запрос гарантированно не дошёл до сервиса и
+# может быть повторён. Таймаут чтения и обрыв ответа не повторяются: сервис
+# уже обрабатывает пакет, и повтор лишь умножил бы нагрузку
+RETRY_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class PredictionError(Exception):
+    """
+    Ошибка при выполнении предсказания на стороне сервиса.
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        """
+        Инициализирует ошибку предсказания.
+
+        Args:
+            message (str): Сообщение об ошибке.
+            status_code (int, optional): Код статуса HTTP.
+        """
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class BatchTooLargeError(PredictionError):
+    """
+    Сервис отклонил пакет, превышающий допустимый размер.
+    """
+
+    def __init__(self, message: str, max_batch_size: int, retry_after: Optional[float] = None):
+        """
+        Инициализирует ошибку размера пакета.
+
+        Args:
+            message (str): Сообщение об ошибке.
+            max_batch_size (int): Допустимый размер пакета на стороне сервиса.
+            retry_after (float, optional): Время в секундах, в течение которого действует ограничение.
+        """
+        super().__init__(message, 413)
+        self.max_batch_size = max_batch_size
+        self.retry_after = retry_after
+
+
+class TweetInferenceClient:
+    """
+    Асинхронный клиент сервиса предсказаний.
+
+    Использует пул keep-alive соединений и объединяет одиночные вызовы
+    predict в пакетные запросы к /api/predict/batch: пакет отправляется,
+    когда набирается batch_size твитов или истекает max_wait_ms с момента
+    поступления первого твита. Запросы, получившие 429/503 или не сумевшие
+    установить соединение, повторяются с экспоненциальной задержкой. Если сервис
+    отклонил пакет как слишком большой (413), пакет делится на части
+    допустимого размера, а размер пакета клиента уменьшается до истечения
+    Retry-After. При use_msgpack запросы и ответы передаются в формате
+    msgpack вместо JSON.
+
+    Пример:
+        async with TweetInferenceClient("http://localhost:8000") as client:
+            result = await client.predict({"id": "1", "created_at": "...", "text": "...", "tweet_type": "SINGLE"})
+    """
+
+    def __init__(self, base_url: str, batch_size: int = 32, max_wait_ms: float = 5.0,
+                 max_connections: int = 20, timeout: float = 30.0, max_retries: int = 5,
+                 backoff_base: float = 0.1, backoff_max: float = 5.0,
+                 thresholds: Optional[List[float]] = None, use_msgpack: bool = False):
+        """
+        Инициализирует клиент.
+
+        Args:
+            base_url (str): Адрес сервиса, например http://localhost:8000.
+            batch_size (int, optional): Максимальный размер пакета. По умолчанию 32.
+            max_wait_ms (float, optional): Максимальное ожидание наполнения пакета. По умолчанию 5 мс.
+            max_connections (int, optional): Размер пула соединений. По умолчанию 20.
+            timeout (float, optional): Таймаут запроса в секундах. По умолчанию 30.
+            max_retries (int, optional): Количество повторов при 429/503 и ошибках соединения. По умолчанию 5.
+            backoff_base (float, optional): Начальная задержка повтора в секундах. По умолчанию 0.1.
+            backoff_max (float, optional): Максимальная задержка повтора в секундах. По умолчанию 5.
+            thresholds (List[float], optional): Пороговые значения для классификации.
+            use_msgpack (bool, optional): Использовать msgpack вместо JSON. По умолчанию False.
+        """
+        self.batch_size = batch_size
+        self.max_batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.params = {"threshold": thresholds} if thresholds else None
+        self.use_msgpack = use_msgpack
+
+        self._http = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+        self._pending = []
+        self._flush_handle = None
+        self._inflight = set()
+        self._batch_size_reset_at = None
+
+    async def __aenter__(self) -> "TweetInferenceClient":
+        """
+        Открывает клиент в контекстном менеджере.
+
+        Returns:
+            TweetInferenceClient: Экземпляр клиента.
+        """
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        """
+        Закрывает клиент при выходе из контекстного менеджера.
+        """
+        await self.close()
+
+    async def predict(self, tweet: Union[TweetInput, Dict[str, Any]]) -> PredictionResponse:
+        """
+        Выполняет предсказание для одного твита.
+
+        Твит добавляется в очередь и отправляется в составе пакета.
+
+        Args:
+            tweet (Union[TweetInput, Dict[str, Any]]): Данные твита.
+
+        Returns:
+            PredictionResponse: Результат предсказания.
+
+        Raises:
+            PredictionError: Если сервис вернул ошибку для твита.
+        """
+        if not isinstance(tweet, TweetInput):
+            tweet = TweetInput(**tweet)
+
+        loop = asyncio.get_running_loop()
+        # Восстанавливаем размер пакета после истечения ограничения сервиса
+        if self._batch_size_reset_at is not None and loop.time() >= self._batch_size_reset_at:
+            self.batch_size = self.max_batch_size
+            self._batch_size_reset_at = None
+
+        future = loop.create_future()
+        self._pending.append((tweet.dict(), future))
+
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    async def predict_many(self, tweets: List[Union[TweetInput, Dict[str, Any]]]) -> List[PredictionResponse]:
+        """
+        Выполняет предсказания для списка твитов с объединением в пакеты.
+
+        Args:
+            tweets (List[Union[TweetInput, Dict[str, Any]]]): Данные твитов.
+
+        Returns:
+            List[PredictionResponse]: Результаты в порядке входных твитов.
+
+        Raises:
+            PredictionError: Если сервис вернул ошибку хотя бы для одного твита.
+        """
+        return list(await asyncio.gather(*(self.predict(tweet) for tweet in tweets)))
+
+    async def predict_batch(self, tweets: List[Union[TweetInput, Dict[str, Any]]]) -> List[BatchPredictionItem]:
+        """
+        Отправляет пакет твитов одним запросом без клиентской очереди.
+
+        Args:
+            tweets (List[Union[TweetInput, Dict[str, Any]]]): Данные твитов.
+
+        Returns:
+            List[BatchPredictionItem]: Результаты в порядке входных твитов, включая ошибки.
+        """
+        payload = [(tweet if isinstance(tweet, TweetInput) else TweetInput(**tweet)).dict() for tweet in tweets]
+        data = await self._post_batch(payload)
+        return [BatchPredictionItem(**item) for item in data["results"]]
+
+    async def close(self) -> None:
+        """
+        Отправляет накопленные твиты, дожидается ответов и закрывает пул соединений.
+        """
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        await self._http.aclose()
+
+    def _flush(self) -> None:
+        """
+        Отправляет накопленные твиты фоновой задачей.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._send_batch(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _send_batch(self, batch: List[tuple]) -> None:
+        """
+        Отправляет пакет и передаёт результаты ожидающим вызовам predict.
+
+        Args:
+            batch (List[tuple]): Пары (данные твита, future).
+        """
+        try:
+            results = (await self._post_batch([tweet for tweet, _ in batch]))["results"]
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), item in zip(batch, results):
+            if future.done():
+                continue
+            if item.get("prediction") is not None:
+                future.set_result(PredictionResponse(**item["prediction"]))
+            else:
+                error = item.get("error") or {}
+                future.set_exception(PredictionError(error.get("message", "неизвестная ошибка"),
+                                                     error.get("status_code")))
+
+        # Твиты, для которых сервис не вернул результат, иначе ожидали бы бесконечно
+        for _, future in batch[len(results):]:
+            if not future.done():
+                future.set_exception(PredictionError(
+                    f"Сервис вернул {len(results)} результатов для пакета из {len(batch)} твитов"
+                ))
+
+    async def _post_batch(self, payload: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Отправляет пакет твитов в выбранном формате и разбирает ответ.
+
+        Если сервис отклонил пакет как слишком большой, пакет делится на части
+        допустимого размера, которые отправляются параллельно.
+
+        Args:
+            payload (List[Dict[str, Any]]): Данные твитов.
+
+        Returns:
+            Dict[str, Any]: Разобранный ответ сервиса.
+        """
+        try:
+            return await self._post_batch_once(payload)
+        except BatchTooLargeError as e:
+            if e.max_batch_size < 1 or e.max_batch_size >= len(payload):
+                raise
+            self._limit_batch_size(e.max_batch_size, e.retry_after)
+            chunk_size = e.max_batch_size
+
+        chunks = [payload[i:i + chunk_size] for i in range(0, len(payload), chunk_size)]
+        responses = await asyncio.gather(*(self._post_batch(chunk) for chunk in chunks))
+        return {"results": [item for response in responses for item in response["results"]]}
+
+    async def _post_batch_once(self, payload: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Отправляет пакет твитов одним запросом в выбранном формате.
+
+        Args:
+            payload (List[Dict[str, Any]]): Данные твитов.
+
+        Returns:
+            Dict[str, Any]: Разобранный ответ сервиса.
+        """
+        if not self.use_msgpack:
+            response = await self._request("POST", "/api/predict/batch", json=payload, params=self.params)
+            return response.json()
+
+        response = await self._request(
+            "POST", "/api/predict/batch",
+            content=msgpack.packb(payload, use_bin_type=True),
+            headers={"Content-Type": "application/msgpack", "Accept": "application/msgpack"},
+            params=self.params
+        )
+        return msgpack.unpackb(response.content, raw=False)
+
+    def _limit_batch_size(self, max_batch_size: int, retry_after: Optional[float]) -> None:
+        """
+        Уменьшает размер пакета клиента до допустимого на стороне сервиса.
+
+        Args:
+            max_batch_size (int): Допустимый размер пакета.
+            retry_after (float, optional): Время в секундах, после которого
+                восстанавливается исходный размер пакета.
+        """
+        self.batch_size = min(self.batch_size, max_batch_size)
+        if retry_after is not None:
+            self._batch_size_reset_at = asyncio.get_running_loop().time() + retry_after
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Выполняет HTTP-запрос с повторами при 429/503 и ошибках установки соединения.
+
+        Таймаут чтения и другие ошибки после отправки запроса не повторяются.
+
+        Задержка растёт экспоненциально со случайным разбросом; если сервис
+        вернул заголовок Retry-After, используется он.
+
+        Args:
+            method (str): HTTP-метод.
+            url (str): Путь относительно адреса сервиса.
+            **kwargs: Аргументы httpx.AsyncClient.request.
+
+        Returns:
+            httpx.Response: Успешный ответ.
+
+        Raises:
+            BatchTooLargeError: Если сервис отклонил пакет как слишком большой.
+            PredictionError: Если запрос не удался после всех повторов или сервис вернул ошибку.
+        """
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                response = await self._http.request(method, url, **kwargs)
+            except RETRY_EXCEPTIONS as e:
+                if attempt == self.max_retries:
+                    raise PredictionError(f"Ошибка соединения с сервисом: {str(e)}")
+            except httpx.TransportError as e:
+                message = f"{e.__class__.__name__}: {str(e)}" if str(e) else e.__class__.__name__
+                raise PredictionError(f"Ошибка при выполнении запроса к сервису: {message}")
+            else:
+                if response.status_code == 413 and "X-Max-Batch-Size" in response.headers:
+                    raise BatchTooLargeError(
+                        self._get_error_message(response),
+                        int(response.headers["X-Max-Batch-Size"]),
+                        self._parse_retry_after(response.headers.get("Retry-After"))
+                    )
+                if response.status_code not in RETRY_STATUS_CODES:
+                    if response.is_error:
+                        raise PredictionError(self._get_error_message(response), response.status_code)
+                    return response
+                if attempt == self.max_retries:
+                    raise PredictionError(self._get_error_message(response), response.status_code)
+                retry_after = response.headers.get("Retry-After")
+
+            delay = min(self.backoff_base * (2 ** attempt), self.backoff_max) * random.uniform(0.5, 1.0)
+            retry_after = self._parse_retry_after(retry_after)
+            if retry_after is not None:
+                delay = min(retry_after, self.backoff_max)
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """
+        Разбирает значение заголовка Retry-After в секундах.
+
+        Args:
+            value (str, optional): Значение заголовка.
+
+        Returns:
+            Optional[float]: Задержка в секундах или None, если заголовок отсутствует или невалиден.
+        """
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _get_error_message(response: httpx.Response) -> str:
+        """
+        Извлекает сообщение об ошибке из ответа сервиса.
+
+        Args:
+            response (httpx.Response): Ответ сервиса.
+
+        Returns:
+            str: Сообщение об ошибке.
+        """
+        try:
+            detail = response.json().get("detail")
+        except ValueError:
+            return f"HTTP {response.status_code}: {response.text}"
+
+        if isinstance(detail, dict) and "error" in detail:
+            return detail["error"].get("message", str(detail))
+        return f"HTTP {response.status_code}: {detail}"
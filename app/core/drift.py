@@ -0,0 +1,479 @@
+"""
+Модуль для мониторинга дрейфа признаков и предсказанных вероятностей
+с помощью потоковых гистограмм фиксированного размера.
+"""
+import json
+import os
+import queue
+import threading
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from app.config.config import config
+from app.core.memory import memory_manager, deep_sizeof
+from app.core.model_loader import model_loader
+from app.features.feature_extraction import feature_extractor
+
+logger = config.logger
+
+# Сглаживание пустых бинов при вычислении PSI
+PSI_EPSILON = 1e-4
+
+
+class StreamingHistogram:
+    """
+    Потоковая гистограмма с постоянным объёмом памяти.
+
+    Границы бинов задаются эталонным снимком. Если их нет, первые
+    warmup_size значений накапливаются, после чего границы вычисляются
+    по их квантилям, а буфер освобождается.
+
+    Для скользящего окна счётчики хранятся в двух половинах: при вызове
+    rotate текущая половина становится предыдущей, а старая отбрасывается.
+    """
+
+    def __init__(self, edges: Optional[List[float]] = None, n_bins: int = 10, warmup_size: int = 1000):
+        """
+        Инициализирует гистограмму.
+
+        Args:
+            edges (List[float], optional): Внутренние границы бинов.
+            n_bins (int, optional): Количество бинов при вычислении границ по квантилям. По умолчанию 10.
+            warmup_size (int, optional): Количество значений для вычисления границ. По умолчанию 1000.
+        """
+        self.n_bins = n_bins
+        self.warmup_size = warmup_size
+        self.edges = None
+        self.counts = None
+        self.missing = 0
+        self.previous_counts = None
+        self.previous_missing = 0
+        self._warmup = []
+        if edges is not None:
+            self._set_edges(np.asarray(edges, dtype=np.float64))
+
+    def _set_edges(self, edges: np.ndarray) -> None:
+        """
+        Устанавливает границы бинов и обнуляет счётчики.
+
+        Args:
+            edges (np.ndarray): Внутренние границы бинов.
+        """
+        self.edges = edges
+        self.counts = np.zeros(len(edges) + 1, dtype=np.int64)
+
+    def update(self, value: Any) -> None:
+        """
+        Учитывает новое значение.
+
+        Args:
+            value (Any): Числовое значение. Пропуски и нечисловые значения учитываются отдельно.
+        """
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            value = float('nan')
+        if np.isnan(value):
+            self.missing += 1
+            return
+
+        if self.edges is None:
+            self._warmup.append(value)
+            if len(self._warmup) >= self.warmup_size:
+                values = np.asarray(self._warmup)
+                quantiles = np.linspace(0.0, 1.0, self.n_bins + 1)[1:-1]
+                self._set_edges(np.unique(np.quantile(values, quantiles)))
+                np.add.at(self.counts, np.searchsorted(self.edges, values, side='right'), 1)
+                self._warmup = []
+            return
+
+        self.counts[np.searchsorted(self.edges, value, side='right')] += 1
+
+    def rotate(self) -> None:
+        """
+        Сдвигает скользящее окно: отбрасывает предыдущую половину счётчиков
+        и начинает новую.
+        """
+        if self.counts is not None:
+            self.previous_counts = self.counts
+            self.counts = np.zeros_like(self.counts)
+        self.previous_missing = self.missing
+        self.missing = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Возвращает гистограмму скользящего окна в виде словаря.
+
+        Returns:
+            Dict[str, Any]: Границы, счётчики и количество пропусков.
+        """
+        counts = self.counts
+        if counts is not None and self.previous_counts is not None:
+            counts = counts + self.previous_counts
+        return {
+            "edges": self.edges.tolist() if self.edges is not None else None,
+            "counts": counts.tolist() if counts is not None else None,
+            "missing": self.missing + self.previous_missing
+        }
+
+
+def compute_drift(reference_counts: List[int], current_counts: np.ndarray) -> Dict[str, Any]:
+    """
+    Вычисляет PSI и статистику Колмогорова-Смирнова по бинам гистограмм.
+
+    KS вычисляется как максимальное расхождение накопленных долей по границам
+    бинов, то есть является приближением по сгруппированным данным.
+
+    Args:
+        reference_counts (List[int]): Счётчики эталонной гистограммы.
+        current_counts (np.ndarray): Счётчики текущей гистограммы с теми же границами.
+
+    Returns:
+        Dict[str, Any]: Значения psi и ks или None, если одна из гистограмм пуста.
+    """
+    reference = np.asarray(reference_counts, dtype=np.float64)
+    current = np.asarray(current_counts, dtype=np.float64)
+    if reference.sum() == 0 or current.sum() == 0:
+        return {"psi": None, "ks": None}
+
+    expected = reference / reference.sum()
+    actual = current / current.sum()
+
+    expected_smoothed = np.clip(expected, PSI_EPSILON, None)
+    actual_smoothed = np.clip(actual, PSI_EPSILON, None)
+    psi = float(np.sum((actual_smoothed - expected_smoothed) * np.log(actual_smoothed / expected_smoothed)))
+    ks = float(np.max(np.abs(np.cumsum(actual) - np.cumsum(expected))))
+
+    return {"psi": psi, "ks": ks}
+
+
+class DriftMonitor:
+    """
+    Класс для мониторинга дрейфа входных признаков и выходных вероятностей.
+
+    Сервис предсказаний передаёт наблюдения в ограниченную очередь, а
+    фоновый поток обновляет гистограммы, поэтому учёт не влияет на задержку
+    ответа. Если очередь переполнена, наблюдение отбрасывается. Статистики
+    дрейфа вычисляются относительно эталонного снимка, сохранённого рядом
+    с моделью, по скользящему окну: каждые window_size наблюдений старшая
+    половина счётчиков отбрасывается, поэтому гистограммы охватывают
+    последние window_size-2*window_size наблюдений.
+    """
+
+    def __init__(self):
+        """
+        Инициализирует монитор дрейфа с настройками из конфигурации.
+        """
+        drift_settings = config.get('drift')
+        self.enabled = drift_settings.get('enabled', True)
+        self.n_bins = drift_settings.get('n_bins', 10)
+        self.probability_bins = drift_settings.get('probability_bins', 10)
+        self.warmup_size = drift_settings.get('warmup_size', 1000)
+        self.window_size = drift_settings.get('window_size', 50000)
+
+        base, _ = os.path.splitext(model_loader.model_path)
+        self.reference_path = drift_settings.get('reference_path') or f"{base}.reference.json"
+        self.reference = self._load_reference()
+
+        # Набор отслеживаемых признаков не зависит от эталона: эталон задаёт только
+        # границы бинов, а признаки, не попавшие в него, продолжают прогрев
+        self.feature_names = (
+            drift_settings.get('features')
+            or feature_extractor.get_feature_names()[:drift_settings.get('max_features', 20)]
+        )
+
+        self.feature_histograms = {}
+        self.probability_histograms = {}
+        self._init_histograms()
+
+        self.observed = 0
+        self.window_observed = 0
+        self.dropped = 0
+        self.skipped_degraded = 0
+        self._queue = queue.Queue(maxsize=drift_settings.get('queue_size', 10000))
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        memory_manager.register_cache("drift_queue", self)
+
+        logger.info(
+            f"Инициализирован монитор дрейфа. Признаков: {len(self.feature_names)}, "
+            f"эталонный снимок: {'загружен' if self.reference else 'отсутствует'}"
+        )
+
+    def _load_reference(self) -> Optional[Dict[str, Any]]:
+        """
+        Загружает эталонный снимок распределений.
+
+        Returns:
+            Optional[Dict[str, Any]]: Эталонный снимок или None, если он отсутствует или повреждён.
+        """
+        if not os.path.exists(self.reference_path):
+            logger.warning(f"Эталонный снимок распределений не найден: {self.reference_path}")
+            return None
+
+        try:
+            with open(self.reference_path, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except Exception as e:
+            logger.error(f"Ошибка при загрузке эталонного снимка распределений: {str(e)}")
+            return None
+
+    def _init_histograms(self) -> None:
+        """
+        Создаёт пустые гистограммы признаков с границами из эталонного снимка.
+        """
+        reference_features = self.reference["features"] if self.reference else {}
+        self.feature_histograms = {
+            name: StreamingHistogram(
+                edges=reference_features.get(name, {}).get("edges"),
+                n_bins=self.n_bins,
+                warmup_size=self.warmup_size
+            )
+            for name in self.feature_names
+        }
+        self.probability_histograms = {}
+
+    def _new_probability_histogram(self) -> StreamingHistogram:
+        """
+        Создаёт гистограмму вероятностей с равномерными бинами на [0, 1].
+
+        Returns:
+            StreamingHistogram: Гистограмма вероятностей.
+        """
+        return StreamingHistogram(edges=np.linspace(0.0, 1.0, self.probability_bins + 1)[1:-1].tolist())
+
+    def observe(self, features: Optional[Dict[str, Any]], probability: float,
+                tweet_type: str, degraded: bool = False) -> None:
+        """
+        Передаёт наблюдение в очередь без блокировки.
+
+        Предсказания в деградированном режиме не учитываются, так как они
+        получены по другому набору признаков и другой моделью.
+
+        Args:
+            features (Dict[str, Any], optional): Извлечённые признаки.
+            probability (float): Предсказанная вероятность.
+            tweet_type (str): Тип твита.
+            degraded (bool, optional): Предсказание получено в деградированном режиме.
+        """
+        if not self.enabled:
+            return
+        if degraded:
+            self.skipped_degraded += 1
+            return
+
+        try:
+            self._queue.put_nowait(({name: features.get(name) for name in self.feature_names},
+                                    probability, tweet_type))
+        except queue.Full:
+            self.dropped += 1
+
+    def memory_usage(self) -> int:
+        """
+        Оценивает объём памяти, занимаемый очередью наблюдений и буферами прогрева.
+
+        Размер очереди оценивается по первому наблюдению, так как все
+        наблюдения содержат одни и те же признаки.
+
+        Returns:
+            int: Оценка в байтах.
+        """
+        with self._queue.mutex:
+            queued = len(self._queue.queue)
+            sample = self._queue.queue[0] if queued else None
+        size = deep_sizeof(sample) * queued if sample is not None else 0
+
+        with self._lock:
+            warmup = [histogram._warmup for histogram in self.feature_histograms.values()]
+        return size + deep_sizeof(warmup)
+
+    def shrink(self, fraction: float) -> None:
+        """
+        Отбрасывает самые старые наблюдения из очереди.
+
+        Args:
+            fraction (float): Доля наблюдений, которую нужно сохранить.
+        """
+        with self._queue.mutex:
+            keep = int(len(self._queue.queue) * fraction)
+            while len(self._queue.queue) > keep:
+                self._queue.queue.popleft()
+                self.dropped += 1
+            self._queue.not_full.notify_all()
+
+    def _update(self, features: Dict[str, Any], probability: float, tweet_type: str) -> None:
+        """
+        Обновляет гистограммы новым наблюдением.
+
+        Args:
+            features (Dict[str, Any]): Значения отслеживаемых признаков.
+            probability (float): Предсказанная вероятность.
+            tweet_type (str): Тип твита.
+        """
+        with self._lock:
+            for name, value in features.items():
+                self.feature_histograms[name].update(value)
+
+            histogram = self.probability_histograms.get(tweet_type)
+            if histogram is None:
+                histogram = self.probability_histograms[tweet_type] = self._new_probability_histogram()
+            histogram.update(probability)
+            self.observed += 1
+            self.window_observed += 1
+
+            if self.window_size and self.window_observed >= self.window_size:
+                self._rotate()
+
+    def _rotate(self) -> None:
+        """
+        Сдвигает скользящее окно всех гистограмм. Вызывается под блокировкой.
+        """
+        for histogram in self.feature_histograms.values():
+            histogram.rotate()
+        for histogram in self.probability_histograms.values():
+            histogram.rotate()
+        self.window_observed = 0
+        logger.info(f"Скользящее окно мониторинга дрейфа сдвинуто после {self.window_size} наблюдений")
+
+    def start(self) -> None:
+        """
+        Запускает фоновый поток обновления гистограмм.
+        """
+        if not self.enabled or self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="drift-monitor", daemon=True)
+        self._thread.start()
+        logger.info("Запущен мониторинг дрейфа")
+
+    def stop(self) -> None:
+        """
+        Останавливает фоновый поток обновления гистограмм.
+        """
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        """
+        Основной цикл фонового потока.
+        """
+        while not self._stop_event.is_set():
+            try:
+                item = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            try:
+                self._update(*item)
+            except Exception as e:
+                logger.error(f"Ошибка при обновлении гистограмм дрейфа: {str(e)}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Возвращает текущие гистограммы в формате эталонного снимка.
+
+        Returns:
+            Dict[str, Any]: Гистограммы признаков и вероятностей по типам твитов.
+        """
+        with self._lock:
+            return {
+                "model_version": model_loader.get_model_info()['version'],
+                "features": {name: h.to_dict() for name, h in self.feature_histograms.items()},
+                "probability": {tweet_type: h.to_dict() for tweet_type, h in self.probability_histograms.items()}
+            }
+
+    def save_reference(self) -> Dict[str, Any]:
+        """
+        Сохраняет текущие гистограммы как эталонный снимок рядом с моделью
+        и начинает накопление текущего окна заново.
+
+        Признаки, для которых ещё не вычислены границы бинов (не завершён
+        прогрев) или нет ни одного значения, в снимок не попадают: для них
+        сохраняется запись из предыдущего эталона, если она была. Так же
+        сохраняются вероятности для типов твитов без наблюдений.
+
+        Returns:
+            Dict[str, Any]: Сохранённый эталонный снимок и список признаков,
+                для которых оставлен предыдущий эталон или эталона нет.
+        """
+        reference = self.snapshot()
+        previous = self.reference or {"features": {}, "probability": {}}
+
+        skipped_features = []
+        for name, histogram in list(reference["features"].items()):
+            if histogram["edges"] is None or not sum(histogram["counts"]):
+                skipped_features.append(name)
+                if name in previous["features"]:
+                    reference["features"][name] = previous["features"][name]
+                else:
+                    del reference["features"][name]
+        for tweet_type, histogram in previous["probability"].items():
+            reference["probability"].setdefault(tweet_type, histogram)
+
+        if skipped_features:
+            logger.warning(
+                f"Эталон не обновлён для признаков без накопленных данных: {', '.join(skipped_features)}"
+            )
+
+        tmp_path = f"{self.reference_path}.tmp.{os.getpid()}"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(reference, file)
+        os.replace(tmp_path, self.reference_path)
+
+        with self._lock:
+            # Прогрев признаков без эталона продолжается с накопленных значений
+            warming_up = {
+                name: self.feature_histograms[name]
+                for name in skipped_features if name not in reference["features"]
+            }
+            self.reference = reference
+            self._init_histograms()
+            self.feature_histograms.update(warming_up)
+            self.observed = 0
+            self.window_observed = 0
+
+        logger.info(f"Эталонный снимок распределений сохранён: {self.reference_path}")
+        return {"reference": reference, "skipped_features": skipped_features}
+
+    def get_report(self) -> Dict[str, Any]:
+        """
+        Возвращает статистики дрейфа относительно эталонного снимка.
+
+        Returns:
+            Dict[str, Any]: PSI и KS по признакам и по вероятностям для каждого типа твита.
+        """
+        current = self.snapshot()
+        reference = self.reference or {"features": {}, "probability": {}}
+
+        def compare(current_hist: Dict[str, Any], reference_hist: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+            stats = {"n": sum(current_hist["counts"] or []), "missing": current_hist["missing"]}
+            if not reference_hist or current_hist["counts"] is None or reference_hist.get("edges") != current_hist["edges"]:
+                stats.update({"reference_n": None, "psi": None, "ks": None})
+                return stats
+            stats["reference_n"] = sum(reference_hist["counts"])
+            stats.update(compute_drift(reference_hist["counts"], np.asarray(current_hist["counts"])))
+            return stats
+
+        return {
+            "reference_loaded": self.reference is not None,
+            "observed": self.observed,
+            "window_size": self.window_size,
+            "dropped": self.dropped,
+            "skipped_degraded": self.skipped_degraded,
+            "features": {
+                name: compare(hist, reference["features"].get(name))
+                for name, hist in current["features"].items()
+            },
+            "probability": {
+                tweet_type: compare(hist, reference["probability"].get(tweet_type))
+                for tweet_type, hist in current["probability"].items()
+            }
+        }
+
+
+# Создаем глобальный экземпляр монитора дрейфа
+drift_monitor = DriftMonitor()
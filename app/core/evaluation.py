@@ -0,0 +1,232 @@
+"""
+Модуль для оценки качества классификации на размеченном наборе твитов
+при разных пороговых значениях без повторного выполнения предсказаний.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from app.config.config import config
+from app.core.memory import memory_manager
+from app.core.prediction import prediction_service
+from app.utils.helpers import validate_tweet_data
+
+logger = config.logger
+
+
+class ThresholdEvaluator:
+    """
+    Класс для оценки precision/recall при множестве пороговых значений.
+
+    Вероятности для размеченного набора вычисляются один раз основной моделью
+    без бюджета времени и кэшируются, после чего метрики для любых порогов
+    считаются только по кэшу. Резервная модель в оценке не участвует, так как
+    порог подбирается для основной модели.
+    """
+
+    def __init__(self):
+        """
+        Инициализирует оценщик с настройками из конфигурации.
+        """
+        evaluation_settings = config.get('evaluation')
+        self.default_thresholds = [
+            round(float(t), 4) for t in np.linspace(0.0, 1.0, evaluation_settings.get('default_thresholds_count', 21))
+        ]
+        self.max_tweets = evaluation_settings.get('max_tweets', 1000)
+        self.max_cached = evaluation_settings.get('max_cached_evaluations', 20)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        memory_manager.register_cache("evaluation_probabilities", self)
+
+        logger.info(
+            f"Инициализирован оценщик пороговых значений. Максимум твитов: {self.max_tweets}, "
+            f"кэшируемых оценок: {self.max_cached}"
+        )
+
+    def evaluate(self, labeled_tweets: List[Dict[str, Any]], thresholds: Optional[List[float]] = None,
+                 rejected_tweet_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Выполняет предсказания для размеченного набора и считает метрики.
+
+        Args:
+            labeled_tweets (List[Dict[str, Any]]): Список словарей вида {"tweet": {...}, "label": 0|1}.
+            thresholds (List[float], optional): Пороговые значения. По умолчанию равномерная сетка.
+            rejected_tweet_ids (List[str], optional): Твиты, отклонённые до оценки
+                (например, при проверке схемы); включаются в список исключённых.
+
+        Returns:
+            Dict[str, Any]: Идентификатор оценки, число твитов и метрики по порогам.
+
+        Raises:
+            ValueError: Если набор пуст или превышает допустимый размер.
+                Допустимый размер уменьшается при нехватке памяти.
+        """
+        rejected_tweet_ids = list(rejected_tweet_ids or [])
+        n_tweets = len(labeled_tweets) + len(rejected_tweet_ids)
+        if not n_tweets:
+            raise ValueError("Набор твитов для оценки пуст")
+        max_tweets = memory_manager.scale_batch_size(self.max_tweets)
+        if n_tweets > max_tweets:
+            raise ValueError(f"Набор твитов для оценки превышает допустимый размер: {max_tweets}")
+
+        evaluation_id = str(uuid.uuid4())
+        logger.info(f"Оценка пороговых значений на {len(labeled_tweets)} твитах. Evaluation ID: {evaluation_id}")
+
+        probabilities = []
+        labels = []
+        failed = rejected_tweet_ids
+        for item in labeled_tweets:
+            tweet_data = item["tweet"]
+            if not validate_tweet_data(tweet_data):
+                logger.warning(f"Твит исключён из оценки: невалидные данные. Tweet ID: {tweet_data.get('id')}")
+                failed.append(tweet_data.get('id'))
+                continue
+            try:
+                result = prediction_service.predict(tweet_data, allow_degraded=False, record_drift=False)
+            except Exception as e:
+                logger.warning(f"Твит исключён из оценки: {str(e)}. Tweet ID: {tweet_data.get('id')}")
+                failed.append(tweet_data.get('id'))
+                continue
+            probabilities.append(result["probability"])
+            labels.append(int(item["label"]))
+
+        if not probabilities:
+            raise ValueError("Не удалось выполнить предсказание ни для одного твита из набора")
+
+        entry = {
+            "probabilities": np.asarray(probabilities, dtype=np.float64),
+            "labels": np.asarray(labels, dtype=np.int8),
+            "failed": failed
+        }
+        with self._lock:
+            self._cache[evaluation_id] = entry
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+
+        return self._build_report(evaluation_id, entry, thresholds)
+
+    def rescore(self, evaluation_id: str, thresholds: Optional[List[float]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Пересчитывает метрики для ранее оценённого набора по кэшированным вероятностям.
+
+        Args:
+            evaluation_id (str): Идентификатор оценки.
+            thresholds (List[float], optional): Пороговые значения. По умолчанию равномерная сетка.
+
+        Returns:
+            Optional[Dict[str, Any]]: Метрики по порогам или None, если оценка не найдена.
+        """
+        with self._lock:
+            entry = self._cache.get(evaluation_id)
+            if entry is not None:
+                self._cache.move_to_end(evaluation_id)
+
+        if entry is None:
+            return None
+
+        logger.info(f"Пересчёт метрик по кэшированным вероятностям. Evaluation ID: {evaluation_id}")
+        return self._build_report(evaluation_id, entry, thresholds)
+
+    def memory_usage(self) -> int:
+        """
+        Оценивает объём памяти, занимаемый кэшированными вероятностями.
+
+        Returns:
+            int: Оценка в байтах.
+        """
+        with self._lock:
+            entries = list(self._cache.values())
+        return sum(entry["probabilities"].nbytes + entry["labels"].nbytes for entry in entries)
+
+    def shrink(self, fraction: float) -> None:
+        """
+        Удаляет давно не использованные оценки из кэша.
+
+        Args:
+            fraction (float): Доля оценок, которую нужно сохранить.
+        """
+        with self._lock:
+            keep = int(len(self._cache) * fraction)
+            while len(self._cache) > keep:
+                self._cache.popitem(last=False)
+
+    def _build_report(self, evaluation_id: str, entry: Dict[str, Any],
+                      thresholds: Optional[List[float]]) -> Dict[str, Any]:
+        """
+        Формирует отчёт с метриками по порогам.
+
+        Args:
+            evaluation_id (str): Идентификатор оценки.
+            entry (Dict[str, Any]): Кэшированные вероятности и метки.
+            thresholds (List[float], optional): Пороговые значения.
+
+        Returns:
+            Dict[str, Any]: Отчёт об оценке.
+        """
+        return {
+            "evaluation_id": evaluation_id,
+            "n_tweets": int(len(entry["labels"])),
+            "n_positive": int(entry["labels"].sum()),
+            "failed_tweet_ids": entry["failed"],
+            "metrics": self.compute_metrics(entry["probabilities"], entry["labels"], thresholds or self.default_thresholds)
+        }
+
+    @staticmethod
+    def compute_metrics(probabilities: np.ndarray, labels: np.ndarray, thresholds: List[float]) -> List[Dict[str, Any]]:
+        """
+        Вычисляет матрицу ошибок, precision, recall и F1 для каждого порога.
+
+        Вероятности сортируются один раз, после чего число предсказанных
+        положительных для каждого порога находится бинарным поиском.
+
+        Args:
+            probabilities (np.ndarray): Вероятности положительного класса.
+            labels (np.ndarray): Истинные метки (0 или 1).
+            thresholds (List[float]): Пороговые значения.
+
+        Returns:
+            List[Dict[str, Any]]: Метрики для каждого порога. Precision равна None,
+                если при пороге нет положительных предсказаний.
+        """
+        order = np.argsort(probabilities)
+        sorted_probabilities = probabilities[order]
+        # Число истинно положительных среди твитов с вероятностью не ниже i-й по возрастанию
+        positives_from = np.concatenate([np.cumsum(labels[order][::-1])[::-1], [0]])
+        total = len(labels)
+        total_positive = int(labels.sum())
+
+        thresholds = np.asarray(sorted(set(thresholds)), dtype=np.float64)
+        starts = np.searchsorted(sorted_probabilities, thresholds, side='left')
+
+        metrics = []
+        for threshold, start in zip(thresholds, starts):
+            tp = int(positives_from[start])
+            predicted_positive = total - int(start)
+            fp = predicted_positive - tp
+            fn = total_positive - tp
+            tn = total - tp - fp - fn
+
+            precision = tp / predicted_positive if predicted_positive else None
+            recall = tp / total_positive if total_positive else None
+            f1 = (2 * precision * recall / (precision + recall)
+                  if precision is not None and recall is not None and precision + recall > 0 else 0.0)
+
+            metrics.append({
+                "threshold": float(threshold),
+                "tp": tp,
+                "fp": fp,
+                "fn": fn,
+                "tn": tn,
+                "precision": precision,
+                "recall": recall,
+                "f1": f1
+            })
+
+        return metrics
+
+
+# Создаем глобальный экземпляр оценщика пороговых значений
+threshold_evaluator = ThresholdEvaluator()
@@ -0,0 +1,340 @@
+"""
+Модуль для учёта потребления памяти компонентами сервиса
+и соблюдения глобального бюджета памяти.
+"""
+import os
+import sys
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:
+    # Модуль resource доступен только в Unix
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from app.config.config import config
+
+logger = config.logger
+
+# Пути к ограничению памяти контейнера для cgroup v2 и v1
+CGROUP_LIMIT_PATHS = [
+    "/sys/fs/cgroup/memory.max",
+    "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+]
+
+MB = 1024 * 1024
+
+
+def get_rss_bytes() -> Optional[int]:
+    """
+    Возвращает текущий объём резидентной памяти процесса.
+
+    Источники перебираются в порядке стоимости: /proc (Linux), psutil
+    (в том числе Windows). Пиковое значение из getrusage не используется:
+    оно не уменьшается, и нехватка памяти после превышения порога
+    сохранялась бы навсегда.
+
+    Returns:
+        Optional[int]: RSS процесса в байтах или None, если ни один источник недоступен.
+    """
+    try:
+        with open("/proc/self/statm", "r") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+
+    return None
+
+
+def get_peak_rss_bytes() -> Optional[int]:
+    """
+    Возвращает пиковый объём резидентной памяти процесса.
+
+    Returns:
+        Optional[int]: Пиковый RSS в байтах или None, если getrusage недоступен.
+    """
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # На macOS ru_maxrss в байтах, на Linux - в килобайтах
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def get_container_limit_bytes() -> Optional[int]:
+    """
+    Возвращает ограничение памяти контейнера из cgroup.
+
+    Returns:
+        Optional[int]: Ограничение в байтах или None, если оно не задано.
+    """
+    for path in CGROUP_LIMIT_PATHS:
+        try:
+            with open(path, "r") as file:
+                value = file.read().strip()
+        except OSError:
+            continue
+        if value == "max":
+            return None
+        limit = int(value)
+        # В cgroup v1 отсутствие ограничения обозначается очень большим числом
+        return limit if limit < 1 << 60 else None
+    return None
+
+
+def deep_sizeof(obj: Any) -> int:
+    """
+    Приблизительно оценивает объём памяти, занимаемый объектом и вложенными объектами.
+
+    Обходятся контейнеры и атрибуты объектов (__dict__), поэтому оценка
+    подходит и для моделей: массивы numpy учитываются по nbytes, в том числе
+    отображённые в память, которые ещё не загружены в RSS. Память нативных
+    библиотек, не представленная массивами numpy, не учитывается.
+
+    Args:
+        obj (Any): Объект для оценки.
+
+    Returns:
+        int: Оценка объёма памяти в байтах.
+    """
+    seen = set()
+    stack = [obj]
+    size = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+
+        size += sys.getsizeof(item)
+        if isinstance(item, np.ndarray):
+            # Представления учитываются через исходный массив; файл, отображённый в память, - по nbytes
+            if not isinstance(item.base, np.ndarray):
+                size += item.nbytes
+            if item.dtype == object:
+                stack.extend(item.ravel())
+        elif isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset, deque)):
+            stack.extend(item)
+        elif isinstance(item, (str, bytes, int, float, bool, type(None), type)):
+            continue
+        elif hasattr(item, "__dict__"):
+            stack.append(vars(item))
+    return size
+
+
+class MemoryManager:
+    """
+    Класс для учёта памяти и соблюдения глобального бюджета.
+
+    Модели учитываются по оценке размера объекта (set_component_size),
+    пайплайны признаков - по приросту RSS во время загрузки. Кэши и очереди
+    регистрируются объектами с методами
+    memory_usage() -> int и shrink(fraction: float) -> None. При приближении
+    RSS к бюджету кэши сжимаются, а допустимые размеры пакетов уменьшаются.
+    """
+
+    def __init__(self):
+        """
+        Инициализирует менеджер памяти с настройками из конфигурации.
+        """
+        memory_settings = config.get('memory')
+        self.container_limit = get_container_limit_bytes()
+
+        budget_mb = memory_settings.get('budget_mb')
+        if budget_mb:
+            self.budget = int(budget_mb * MB)
+        elif self.container_limit:
+            self.budget = int(self.container_limit * memory_settings.get('container_limit_fraction', 0.85))
+        else:
+            self.budget = None
+
+        self.soft_limit = memory_settings.get('soft_limit', 0.8)
+        self.min_batch_fraction = memory_settings.get('min_batch_fraction', 0.1)
+        self.cache_shrink_fraction = memory_settings.get('cache_shrink_fraction', 0.5)
+        self.check_interval = memory_settings.get('check_interval_s', 5)
+
+        self.components = {}
+        self.caches = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        budget_info = f"{self.budget / MB:.0f} МБ" if self.budget else "не задан"
+        logger.info(f"Инициализирован менеджер памяти. Бюджет памяти: {budget_info}")
+        if self.budget and get_rss_bytes() is None:
+            logger.warning(
+                "Текущий RSS недоступен (нет /proc и psutil), контроль бюджета памяти отключён"
+            )
+
+    @contextmanager
+    def track_component(self, name: str):
+        """
+        Учитывает прирост RSS при загрузке компонента.
+
+        Args:
+            name (str): Название компонента.
+        """
+        rss_before = get_rss_bytes()
+        try:
+            yield
+        finally:
+            rss_after = get_rss_bytes()
+            if rss_before is not None and rss_after is not None:
+                self.set_component_size(name, max(rss_after - rss_before, 0))
+
+    def set_component_size(self, name: str, size: int) -> None:
+        """
+        Сохраняет оценку памяти, занимаемой компонентом.
+
+        Args:
+            name (str): Название компонента.
+            size (int): Оценка в байтах.
+        """
+        with self._lock:
+            self.components[name] = size
+        logger.info(f"Компонент '{name}' занимает примерно {size / MB:.1f} МБ")
+
+    def register_cache(self, name: str, cache: Any) -> None:
+        """
+        Регистрирует кэш для учёта памяти и сжатия при нехватке.
+
+        Args:
+            name (str): Название кэша.
+            cache (Any): Объект с методами memory_usage() и shrink(fraction).
+        """
+        with self._lock:
+            self.caches[name] = cache
+        logger.debug(f"Зарегистрирован кэш '{name}'")
+
+    def get_pressure(self) -> float:
+        """
+        Возвращает отношение текущего RSS к бюджету памяти.
+
+        Returns:
+            float: Доля использованного бюджета или 0.0, если бюджет не задан
+                либо текущий RSS недоступен.
+        """
+        rss = get_rss_bytes()
+        if not self.budget or rss is None:
+            return 0.0
+        return rss / self.budget
+
+    def scale_batch_size(self, batch_size: int) -> int:
+        """
+        Уменьшает размер пакета пропорционально нехватке памяти.
+
+        До мягкого порога размер не меняется, далее линейно снижается
+        до минимальной доли при полном использовании бюджета.
+
+        Args:
+            batch_size (int): Исходный размер пакета.
+
+        Returns:
+            int: Допустимый размер пакета (не меньше 1).
+        """
+        pressure = self.get_pressure()
+        if pressure <= self.soft_limit:
+            return batch_size
+
+        overload = min((pressure - self.soft_limit) / (1.0 - self.soft_limit), 1.0)
+        fraction = 1.0 - overload * (1.0 - self.min_batch_fraction)
+        return max(int(batch_size * fraction), 1)
+
+    def enforce_budget(self) -> None:
+        """
+        Сжимает зарегистрированные кэши, если RSS превысил мягкий порог бюджета.
+        """
+        pressure = self.get_pressure()
+        if pressure <= self.soft_limit:
+            return
+
+        logger.warning(
+            f"Использовано {pressure:.0%} бюджета памяти. "
+            f"Сжатие кэшей до {self.cache_shrink_fraction:.0%} текущего размера"
+        )
+        with self._lock:
+            caches = list(self.caches.items())
+        for name, cache in caches:
+            try:
+                cache.shrink(self.cache_shrink_fraction)
+            except Exception as e:
+                logger.error(f"Ошибка при сжатии кэша '{name}': {str(e)}")
+
+    def start(self) -> None:
+        """
+        Запускает фоновую проверку бюджета памяти.
+        """
+        if not self.budget or get_rss_bytes() is None or self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="memory-manager", daemon=True)
+        self._thread.start()
+        logger.info(f"Запущен контроль бюджета памяти с интервалом {self.check_interval} с")
+
+    def stop(self) -> None:
+        """
+        Останавливает фоновую проверку бюджета памяти.
+        """
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        """
+        Основной цикл фоновой проверки.
+        """
+        while not self._stop_event.wait(self.check_interval):
+            self.enforce_budget()
+
+    def get_report(self) -> Dict[str, Any]:
+        """
+        Возвращает отчёт о потреблении памяти.
+
+        Returns:
+            Dict[str, Any]: Текущий и пиковый RSS процесса, бюджет, ограничение
+                контейнера, оценки памяти по компонентам и кэшам в мегабайтах.
+        """
+        with self._lock:
+            components = dict(self.components)
+            caches = list(self.caches.items())
+
+        cache_usage = {}
+        for name, cache in caches:
+            try:
+                cache_usage[name] = round(cache.memory_usage() / MB, 3)
+            except Exception as e:
+                logger.error(f"Ошибка при оценке памяти кэша '{name}': {str(e)}")
+                cache_usage[name] = None
+
+        rss = get_rss_bytes()
+        peak_rss = get_peak_rss_bytes()
+        return {
+            "rss_mb": round(rss / MB, 1) if rss is not None else None,
+            "peak_rss_mb": round(peak_rss / MB, 1) if peak_rss is not None else None,
+            "budget_mb": round(self.budget / MB, 1) if self.budget else None,
+            "container_limit_mb": round(self.container_limit / MB, 1) if self.container_limit else None,
+            "pressure": round(self.get_pressure(), 3),
+            "components_mb": {name: round(size / MB, 1) for name, size in components.items()},
+            "caches_mb": cache_usage
+        }
+
+
+# Создаем глобальный экземпляр менеджера памяти
+memory_manager = MemoryManager()
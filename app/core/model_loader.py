@@ -1,36 +1,76 @@
 """
 Модуль для загрузки и управления моделями классификации твитов.
 """
+import hashlib
+import json
 import os
+import time
 import joblib
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from app.config.config import config
+from app.core.memory import memory_manager, deep_sizeof
 
 logger = config.logger
 
+# Размер блока при вычислении хэша файла
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def compute_file_hash(path: str) -> str:
+    """
+    Вычисляет SHA-256 содержимого файла.
+
+    Args:
+        path (str): Путь к файлу.
+
+    Returns:
+        str: Хэш в шестнадцатеричном виде.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 
 class ModelLoader:
     """
     Класс для загрузки и управления моделями машинного обучения.
 
-    Отвечает за загрузку предобученной модели FLAML из файловой системы
-    и предоставление информации о модели.
+    Отвечает за загрузку предобученной модели FLAML из файловой системы,
+    резервной модели для деградированного режима и предоставление информации о модели.
+
+    При включённой быстрой загрузке рядом с исходным файлом joblib создаётся
+    несжатая копия (*.fast.joblib), числовые массивы которой отображаются
+    в память при загрузке, и файл метаданных (*.fast.json) с хэшами исходного
+    и преобразованного файлов. Копия пересоздаётся при изменении исходного файла.
     """
 
-    def __init__(self, model_path: str = None):
+    def __init__(self, model_path: str = None, fallback_model_path: str = None):
         """
         Инициализирует загрузчик моделей.
 
         Args:
             model_path (str, optional): Путь к файлу модели.
                 По умолчанию берётся из конфигурации.
+            fallback_model_path (str, optional): Путь к файлу резервной модели.
+                По умолчанию берётся из конфигурации.
         """
-        self.model_path = model_path or config.get('model', 'path')
+        model_settings = config.get('model')
+        self.model_path = model_path or model_settings['path']
+        self.fallback_model_path = fallback_model_path or model_settings.get('fallback_path')
+        self.fast_load = model_settings.get('fast_load', True)
+        self.verify_checksum = model_settings.get('verify_checksum', True)
         self.model = None
+        self.fallback_model = None
         self.model_info = {
-            'version': config.get('model', 'version'),
-            'threshold': config.get('model', 'threshold')
+            'version': model_settings['version'],
+            'threshold': model_settings['threshold'],
+            'fallback_version': model_settings.get('fallback_version'),
+            'fallback_threshold': model_settings.get('fallback_threshold', model_settings['threshold']),
+            'load_time_ms': None,
+            'load_source': None
         }
 
         logger.info(f"Инициализирован загрузчик моделей. Путь к модели: {self.model_path}")
@@ -55,15 +95,231 @@ class ModelLoader:
                 raise FileNotFoundError(f"Файл модели не найден: {self.model_path}")
 
             logger.info(f"Загрузка модели из {self.model_path}")
-            self.model = joblib.load(self.model_path)
+            start = time.perf_counter()
+            self.model, load_source = self._load_artifact(self.model_path)
+            self.model_info['load_time_ms'] = round((time.perf_counter() - start) * 1000.0, 1)
+            self.model_info['load_source'] = load_source
+            # Прирост RSS не годится: массивы, отображённые в память, ещё не загружены,
+            # а при создании быстрого формата учитывается временная полная копия
+            memory_manager.set_component_size("model", deep_sizeof(self.model))
 
-            logger.info(f"Модель успешно загружена. Версия: {self.model_info['version']}")
+            logger.info(
+                f"Модель успешно загружена. Версия: {self.model_info['version']}, "
+                f"время загрузки: {self.model_info['load_time_ms']} мс, источник: {load_source}"
+            )
             return self.model
 
         except Exception as e:
             logger.error(f"Ошибка при загрузке модели: {str(e)}")
             raise
 
+    def load_fallback_model(self) -> Optional[Any]:
+        """
+        Загружает резервную модель, обученную только на структурных
+        и лёгких текстовых признаках.
+
+        В отличие от основной модели, отсутствие резервной модели не является
+        ошибкой: в этом случае деградированный режим просто недоступен.
+
+        Returns:
+            Optional[Any]: Загруженная резервная модель или None, если она недоступна.
+        """
+        if self.fallback_model is not None:
+            return self.fallback_model
+
+        if not self.fallback_model_path:
+            logger.info("Путь к резервной модели не задан, деградированный режим недоступен")
+            return None
+
+        if not os.path.exists(self.fallback_model_path):
+            logger.warning(f"Файл резервной модели не найден: {self.fallback_model_path}")
+            return None
+
+        try:
+            logger.info(f"Загрузка резервной модели из {self.fallback_model_path}")
+            self.fallback_model, _ = self._load_artifact(self.fallback_model_path)
+            memory_manager.set_component_size("fallback_model", deep_sizeof(self.fallback_model))
+
+            logger.info(f"Резервная модель успешно загружена. Версия: {self.model_info['fallback_version']}")
+            return self.fallback_model
+
+        except Exception as e:
+            logger.error(f"Ошибка при загрузке резервной модели: {str(e)}")
+            return None
+
+    def _load_artifact(self, path: str) -> tuple:
+        """
+        Загружает артефакт модели, по возможности из быстрого формата.
+
+        Ошибки при работе с быстрым форматом не являются критическими:
+        в этом случае модель загружается из исходного файла joblib. Если
+        каталог модели недоступен для записи (например, смонтирован только
+        для чтения), быстрый формат не создаётся. Если создать его не удалось,
+        используется уже загруженный объект без повторной загрузки.
+
+        Args:
+            path (str): Путь к исходному файлу joblib.
+
+        Returns:
+            tuple: Загруженный объект и источник загрузки ("fast" или "joblib").
+        """
+        if not self.fast_load:
+            return joblib.load(path), "joblib"
+
+        fast_path, meta_path = self._get_fast_paths(path)
+        try:
+            if self._is_fast_artifact_valid(path, fast_path, meta_path):
+                return joblib.load(fast_path, mmap_mode='r'), "fast"
+        except Exception as e:
+            logger.warning(f"Не удалось использовать быстрый формат модели {fast_path}: {str(e)}. "
+                           f"Загрузка из исходного файла")
+            return joblib.load(path), "joblib"
+
+        if not os.access(os.path.dirname(os.path.abspath(fast_path)), os.W_OK):
+            logger.warning(f"Каталог модели недоступен для записи, быстрый формат не создаётся: {fast_path}")
+            return joblib.load(path), "joblib"
+
+        obj = joblib.load(path)
+        try:
+            self._build_fast_artifact(obj, path, fast_path, meta_path)
+            return joblib.load(fast_path, mmap_mode='r'), "fast"
+        except Exception as e:
+            logger.warning(f"Не удалось создать быстрый формат модели {fast_path}: {str(e)}. "
+                           f"Используется модель из исходного файла")
+            return obj, "joblib"
+
+    @staticmethod
+    def _get_fast_paths(path: str) -> tuple:
+        """
+        Возвращает пути к преобразованному артефакту и его метаданным.
+
+        Args:
+            path (str): Путь к исходному файлу joblib.
+
+        Returns:
+            tuple: Путь к файлу *.fast.joblib и к файлу *.fast.json.
+        """
+        base, _ = os.path.splitext(path)
+        return f"{base}.fast.joblib", f"{base}.fast.json"
+
+    @staticmethod
+    def _get_source_fingerprint(path: str) -> Dict[str, int]:
+        """
+        Возвращает размер и время изменения исходного файла.
+
+        Args:
+            path (str): Путь к исходному файлу.
+
+        Returns:
+            Dict[str, int]: Размер файла и время изменения в наносекундах.
+        """
+        stat = os.stat(path)
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def _is_fast_artifact_valid(self, path: str, fast_path: str, meta_path: str) -> bool:
+        """
+        Проверяет, соответствует ли преобразованный артефакт исходному файлу.
+
+        Если размер и время изменения исходного файла совпадают с сохранёнными,
+        хэш исходного файла не пересчитывается. Если они изменились, а хэш нет,
+        сохранённые размер и время обновляются. Хэш преобразованного артефакта
+        проверяется при включённой проверке целостности. Нечитаемые метаданные
+        считаются невалидными, и артефакт пересоздаётся.
+
+        Args:
+            path (str): Путь к исходному файлу joblib.
+            fast_path (str): Путь к преобразованному артефакту.
+            meta_path (str): Путь к файлу метаданных.
+
+        Returns:
+            bool: True, если артефакт можно использовать.
+        """
+        if not (os.path.exists(fast_path) and os.path.exists(meta_path)):
+            logger.info(f"Быстрый формат модели отсутствует: {fast_path}")
+            return False
+
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as file:
+                meta = json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Метаданные быстрого формата модели повреждены, файл будет пересоздан: {str(e)}")
+            return False
+        if not isinstance(meta, dict):
+            logger.warning(f"Метаданные быстрого формата модели повреждены, файл будет пересоздан: {meta_path}")
+            return False
+
+        fingerprint = self._get_source_fingerprint(path)
+        fingerprint_changed = fingerprint != meta.get('source_fingerprint')
+        if fingerprint_changed and compute_file_hash(path) != meta.get('source_sha256'):
+            logger.info(f"Исходный файл модели изменился, быстрый формат будет пересоздан: {path}")
+            return False
+
+        if self.verify_checksum and compute_file_hash(fast_path) != meta.get('sha256'):
+            logger.warning(f"Хэш быстрого формата модели не совпадает, файл будет пересоздан: {fast_path}")
+            return False
+
+        if fingerprint_changed:
+            # Содержимое не изменилось (например, файл скопирован заново): обновляем
+            # размер и время, чтобы не пересчитывать хэш исходного файла при каждом запуске
+            meta['source_fingerprint'] = fingerprint
+            try:
+                self._write_meta(meta_path, meta)
+                logger.info(f"Обновлены метаданные быстрого формата модели: {meta_path}")
+            except OSError as e:
+                logger.warning(f"Не удалось обновить метаданные быстрого формата модели: {str(e)}")
+
+        return True
+
+    @staticmethod
+    def _write_meta(meta_path: str, meta: Dict[str, Any]) -> None:
+        """
+        Атомарно записывает метаданные быстрого формата.
+
+        Args:
+            meta_path (str): Путь к файлу метаданных.
+            meta (Dict[str, Any]): Метаданные.
+        """
+        tmp_path = f"{meta_path}.tmp.{os.getpid()}"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(meta, file)
+        os.replace(tmp_path, meta_path)
+
+    @staticmethod
+    def _build_fast_artifact(obj: Any, path: str, fast_path: str, meta_path: str) -> None:
+        """
+        Сохраняет загруженную модель в несжатом формате для отображения в память.
+
+        Файлы записываются во временные копии и атомарно переименовываются,
+        поэтому параллельно запускающиеся процессы не видят частично записанный артефакт.
+
+        Args:
+            obj (Any): Модель, загруженная из исходного файла.
+            path (str): Путь к исходному файлу joblib.
+            fast_path (str): Путь к преобразованному артефакту.
+            meta_path (str): Путь к файлу метаданных.
+        """
+        logger.info(f"Создание быстрого формата модели: {fast_path}")
+        start = time.perf_counter()
+
+        fingerprint = ModelLoader._get_source_fingerprint(path)
+        source_sha256 = compute_file_hash(path)
+
+        tmp_path = f"{fast_path}.tmp.{os.getpid()}"
+        try:
+            joblib.dump(obj, tmp_path, compress=0)
+            meta = {
+                'source_fingerprint': fingerprint,
+                'source_sha256': source_sha256,
+                'sha256': compute_file_hash(tmp_path)
+            }
+            os.replace(tmp_path, fast_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        ModelLoader._write_meta(meta_path, meta)
+
+        logger.info(f"Быстрый формат модели создан за {(time.perf_counter() - start) * 1000.0:.1f} мс")
+
     def get_model_info(self) -> Dict[str, Any]:
         """
         Возвращает информацию о модели.
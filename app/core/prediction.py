@@ -1,14 +1,20 @@
 """
 Модуль для выполнения предсказаний с использованием загруженной модели FLAML.
 """
+import threading
 import uuid
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextlib import nullcontext
+from typing import Dict, Any, List, Optional
 
 import pandas as pd
 
 from app.config.config import config
 from app.core.model_loader import model_loader
+from app.core.drift import drift_monitor
+from app.core.profiling import profiler, RequestTrace
 from app.features.feature_extraction import feature_extractor
+from app.utils.helpers import validate_tweet_data
 
 logger = config.logger
 
@@ -18,7 +24,9 @@ class PredictionService:
     Сервис для выполнения предсказаний с использованием загруженной модели.
 
     Отвечает за применение обученной модели к извлеченным признакам
-    и формирование результата предсказания.
+    и формирование результата предсказания. Если полный набор признаков
+    не удаётся извлечь в рамках бюджета времени, сервис переходит
+    в деградированный режим и использует резервную модель.
     """
 
     def __init__(self):
@@ -26,21 +34,65 @@ class PredictionService:
         Инициализирует сервис предсказаний.
         """
         self.model = model_loader.load_model()
+        self.fallback_model = model_loader.load_fallback_model()
         self.threshold = model_loader.get_model_info()['threshold']
+        self.fallback_threshold = model_loader.get_model_info()['fallback_threshold']
+
+        # Настройки бюджета времени и деградированного режима
+        prediction_settings = config.get('prediction')
+        self.latency_budget = prediction_settings.get('latency_budget_ms', 1500) / 1000.0
+        self.queue_timeout = prediction_settings.get('queue_timeout_ms', 1500) / 1000.0
+        self.degraded_mode_enabled = prediction_settings.get('degraded_mode', True)
+        self.executor = ThreadPoolExecutor(
+            max_workers=prediction_settings.get('max_workers', 40),
+            thread_name_prefix="feature-extraction"
+        )
+        # Отдельный пул для твитов пакета: его задачи ждут извлечения в основном пуле
+        self.batch_executor = ThreadPoolExecutor(
+            max_workers=prediction_settings.get('batch_workers', 64),
+            thread_name_prefix="batch-prediction"
+        )
 
         logger.info("Инициализирован сервис предсказаний")
         logger.info(f"Используемое пороговое значение для классификации: {self.threshold}")
+        logger.info(
+            f"Бюджет времени на извлечение признаков: {self.latency_budget:.3f} с, "
+            f"деградированный режим: {'доступен' if self.degraded_mode_available else 'недоступен'}"
+        )
 
-    def predict(self, tweet_data: Dict[str, Any]) -> Dict[str, Any]:
+    @property
+    def degraded_mode_available(self) -> bool:
+        """
+        Проверяет, может ли сервис перейти в деградированный режим.
+
+        Returns:
+            bool: True, если деградированный режим включён и резервная модель загружена.
+        """
+        return self.degraded_mode_enabled and self.fallback_model is not None
+
+    def predict(self, tweet_data: Dict[str, Any], thresholds: Optional[List[float]] = None,
+                profile: bool = False, allow_degraded: bool = True,
+                record_drift: bool = True) -> Dict[str, Any]:
         """
         Выполняет предсказание для одного твита.
 
         Args:
             tweet_data (Dict[str, Any]): Данные твита.
+            thresholds (List[float], optional): Пороговые значения для классификации.
+                По умолчанию используется порог из конфигурации модели.
+            profile (bool, optional): Добавить в результат разбивку времени по этапам
+                и профиль стеков вызовов. По умолчанию False.
+            allow_degraded (bool, optional): Разрешить переход в деградированный режим.
+                Если False, признаки извлекаются без ограничения по времени и
+                используется только основная модель. По умолчанию True.
+            record_drift (bool, optional): Учитывать предсказание в мониторинге дрейфа.
+                Служебные запросы (например, оценка порогов) не должны искажать
+                распределения рабочего трафика. По умолчанию True.
 
         Returns:
             Dict[str, Any]: Результат предсказания в формате
-                {"request_id": "id", "tweet_id": "tweet_id", "probability": 0.87}
+                {"request_id": "id", "tweet_id": "tweet_id", "probability": 0.87, "degraded": false,
+                 "classifications": [{"threshold": 0.5, "label": 1}]}
 
         Raises:
             Exception: Если возникла ошибка при выполнении предсказания.
@@ -50,51 +102,232 @@ class PredictionService:
 
         logger.info(f"Выполнение предсказания для твита с ID: {tweet_id}. Request ID: {request_id}")
 
-        # Извлекаем признаки
-        features = feature_extractor.extract_features(tweet_data)
+        features = None
+        # Заголовок профилирования учитывается, только если его разрешил администратор
+        profile = profile and profiler.allow_profile_header
+        trace = profiler.start_trace(request_id, tweet_id, force=profile)
+        try:
+            # Извлекаем полный набор признаков в рамках бюджета времени
+            if allow_degraded:
+                features = self._extract_features_within_budget(tweet_data, trace)
+            else:
+                features = self._extract_features(tweet_data, trace)
 
-        # Преобразуем в DataFrame для модели
-        features_df = pd.DataFrame([features])
+            if features is not None:
+                probability = self.predict_probability(pd.DataFrame([features]), trace=trace)
+                degraded = False
+            else:
+                # Деградированный режим: лёгкие признаки и резервная модель
+                with trace.span("extract_light_features"):
+                    light_features = feature_extractor.extract_light_features(tweet_data)
+                probability = self.predict_probability(
+                    pd.DataFrame([light_features]), self.fallback_model, trace=trace
+                )
+                degraded = True
+        finally:
+            profiler.finish_trace(trace)
 
-        # Выполняем предсказание
-        probability = self.predict_probability(features_df)
+        # Передаём наблюдение в монитор дрейфа без ожидания обработки
+        if record_drift:
+            drift_monitor.observe(features, probability, tweet_data.get('tweet_type'), degraded)
 
         # Формируем результат
         result = {
             "request_id": request_id,
             "tweet_id": tweet_id,
-            "probability": float(probability)
+            "probability": float(probability),
+            "degraded": degraded,
+            "classifications": self.classify(probability, thresholds, degraded)
         }
+        if profile:
+            result["trace"] = trace.to_dict()
 
         # Логирование решения
-        classification = "положительный" if probability >= self.threshold else "отрицательный"
+        threshold = self.fallback_threshold if degraded else self.threshold
+        classification = "положительный" if probability >= threshold else "отрицательный"
         logger.info(
             f"Предсказание успешно выполнено. Tweet ID: {tweet_id}, "
-            f"вероятность: {probability:.4f}, класс: {classification}"
+            f"вероятность: {probability:.4f}, класс: {classification}, "
+            f"деградированный режим: {degraded}"
         )
 
         return result
 
-    def predict_probability(self, features_df: pd.DataFrame) -> float:
+    def predict_batch(self, tweets: List[Dict[str, Any]],
+                      thresholds: Optional[List[float]] = None) -> List[Dict[str, Any]]:
+        """
+        Выполняет предсказания для пакета твитов.
+
+        Твиты обрабатываются параллельно в отдельном пуле потоков, поэтому время
+        пакета определяется самым медленным твитом, а не суммой по всем твитам.
+        Невалидный твит или ошибка при обработке одного твита не прерывают
+        обработку остальных.
+
+        Args:
+            tweets (List[Dict[str, Any]]): Данные твитов.
+            thresholds (List[float], optional): Пороговые значения для классификации.
+
+        Returns:
+            List[Dict[str, Any]]: Результаты в порядке входных твитов в формате
+                {"tweet_id": "id", "prediction": {...}} или {"tweet_id": "id", "error": {...}}.
+        """
+        logger.info(f"Выполнение пакетного предсказания для {len(tweets)} твитов")
+        return list(self.batch_executor.map(lambda tweet_data: self._predict_batch_item(tweet_data, thresholds), tweets))
+
+    def _predict_batch_item(self, tweet_data: Dict[str, Any],
+                            thresholds: Optional[List[float]] = None) -> Dict[str, Any]:
+        """
+        Выполняет предсказание для одного твита пакета.
+
+        Args:
+            tweet_data (Dict[str, Any]): Данные твита.
+            thresholds (List[float], optional): Пороговые значения для классификации.
+
+        Returns:
+            Dict[str, Any]: Результат в формате {"tweet_id": "id", "prediction": {...}}
+                или {"tweet_id": "id", "error": {...}}.
+        """
+        tweet_id = tweet_data.get('id', 'unknown')
+        if not validate_tweet_data(tweet_data):
+            logger.warning(f"Невалидные данные твита в пакете. Tweet ID: {tweet_id}")
+            return {"tweet_id": tweet_id, "error": {"message": "Невалидные данные твита", "status_code": 400}}
+
+        try:
+            return {"tweet_id": tweet_id, "prediction": self.predict(tweet_data, thresholds)}
+        except Exception as e:
+            logger.error(f"Ошибка при выполнении предсказания в пакете: {str(e)}. Tweet ID: {tweet_id}")
+            return {
+                "tweet_id": tweet_id,
+                "error": {"message": f"Ошибка при выполнении предсказания: {str(e)}", "status_code": 500}
+            }
+
+    def classify(self, probability: float, thresholds: Optional[List[float]] = None,
+                 degraded: bool = False) -> List[Dict[str, Any]]:
+        """
+        Классифицирует вероятность по одному или нескольким пороговым значениям.
+
+        Args:
+            probability (float): Вероятность положительного класса.
+            thresholds (List[float], optional): Пороговые значения.
+                По умолчанию используется порог из конфигурации модели,
+                а в деградированном режиме - порог резервной модели.
+            degraded (bool, optional): Вероятность получена резервной моделью.
+
+        Returns:
+            List[Dict[str, Any]]: Метки классов для каждого порога в формате
+                [{"threshold": 0.5, "label": 1}].
+        """
+        if not thresholds:
+            thresholds = [self.fallback_threshold if degraded else self.threshold]
+
+        return [
+            {"threshold": float(threshold), "label": int(probability >= threshold)}
+            for threshold in thresholds
+        ]
+
+    def _extract_features_within_budget(self, tweet_data: Dict[str, Any],
+                                        trace: RequestTrace) -> Optional[Dict[str, Any]]:
+        """
+        Извлекает полный набор признаков с ограничением по времени.
+
+        Бюджет времени отсчитывается с момента, когда свободный поток начал
+        извлечение, поэтому ожидание в очереди пула под нагрузкой его не
+        расходует. Ожидание свободного потока ограничено отдельно
+        (queue_timeout): если все потоки заняты, например зависшими на
+        медленной зависимости извлечениями, запрос переходит в
+        деградированный режим. Если деградированный режим недоступен,
+        извлечение выполняется без ограничения, а ошибки пробрасываются
+        вызывающему коду.
+
+        Args:
+            tweet_data (Dict[str, Any]): Данные твита.
+            trace (RequestTrace): Трассировка запроса.
+
+        Returns:
+            Optional[Dict[str, Any]]: Извлечённые признаки или None, если бюджет
+                времени превышен либо извлечение завершилось ошибкой.
+        """
+        if not self.degraded_mode_available:
+            return self._extract_features(tweet_data, trace)
+
+        tweet_id = tweet_data.get('id', 'unknown')
+        started = threading.Event()
+
+        def extract() -> Dict[str, Any]:
+            started.set()
+            return self._extract_features(tweet_data, trace)
+
+        future = self.executor.submit(extract)
+
+        # Если задача всё ещё в очереди, отменяем её; если поток успел её взять, ждём результат
+        if not started.wait(timeout=self.queue_timeout) and future.cancel():
+            logger.warning(
+                f"Нет свободного потока для извлечения признаков за {self.queue_timeout:.3f} с. "
+                f"Tweet ID: {tweet_id}. Переход в деградированный режим"
+            )
+            return None
+
+        try:
+            return future.result(timeout=self.latency_budget)
+        except FutureTimeoutError:
+            # Поток продолжит работу в фоне, но его результат больше не нужен
+            future.cancel()
+            logger.warning(
+                f"Превышен бюджет времени на извлечение признаков ({self.latency_budget:.3f} с). "
+                f"Tweet ID: {tweet_id}. Переход в деградированный режим"
+            )
+        except Exception as e:
+            logger.warning(
+                f"Ошибка при извлечении полного набора признаков: {str(e)}. "
+                f"Tweet ID: {tweet_id}. Переход в деградированный режим"
+            )
+
+        return None
+
+    @staticmethod
+    def _extract_features(tweet_data: Dict[str, Any], trace: RequestTrace) -> Dict[str, Any]:
+        """
+        Извлекает полный набор признаков с замером времени.
+
+        Args:
+            tweet_data (Dict[str, Any]): Данные твита.
+            trace (RequestTrace): Трассировка запроса.
+
+        Returns:
+            Dict[str, Any]: Извлечённые признаки.
+        """
+        with trace.span("extract_features"):
+            return feature_extractor.extract_features(tweet_data)
+
+    def predict_probability(self, features_df: pd.DataFrame, model_bundle: Optional[Dict[str, Any]] = None,
+                            trace: Optional[RequestTrace] = None) -> float:
         """
         Выполняет предсказание вероятности для данных признаков.
 
         Args:
             features_df (pd.DataFrame): DataFrame с признаками.
+            model_bundle (Dict[str, Any], optional): Словарь с предобработкой и моделью.
+                По умолчанию используется основная модель.
+            trace (RequestTrace, optional): Трассировка запроса для замера этапов.
 
         Returns:
             float: Вероятность принадлежности к положительному классу.
         """
+        if model_bundle is None:
+            model_bundle = self.model
+
         try:
             # Извлекаем компоненты из словаря
-            preprocessing = self.model.get("preprocessing")
-            model = self.model.get("model")
+            preprocessing = model_bundle.get("preprocessing")
+            model = model_bundle.get("model")
 
             # Применяем предобработку
-            features_df = preprocessing.transform(features_df)
+            with trace.span("preprocessing.transform") if trace else nullcontext():
+                features_df = preprocessing.transform(features_df)
 
             # Получаем вероятности классов из модели
-            probabilities = model.predict_proba(features_df)
+            with trace.span("predict_proba") if trace else nullcontext():
+                probabilities = model.predict_proba(features_df)
 
             # Проверяем формат выходных данных модели
             if probabilities.shape[1] != 2:
@@ -114,4 +347,4 @@ class PredictionService:
 
 
 # Создаем глобальный экземпляр сервиса предсказаний
-prediction_service = PredictionService()
\ No newline at end of file
+prediction_service = PredictionService()
@@ -0,0 +1,355 @@
+"""
+Модуль для профилирования предсказаний: разбивка времени по этапам
+и сэмплирование стеков вызовов для медленных запросов.
+"""
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+from app.config.config import config
+from app.core.memory import memory_manager, deep_sizeof
+
+logger = config.logger
+
+
+class RequestTrace:
+    """
+    Трассировка одного запроса на предсказание.
+
+    Хранит длительности этапов (спанов) и идентификаторы потоков,
+    в которых они выполнялись, чтобы сэмплер знал, какие стеки снимать.
+    """
+
+    def __init__(self, request_id: str, tweet_id: str):
+        """
+        Инициализирует трассировку запроса.
+
+        Args:
+            request_id (str): Идентификатор запроса.
+            tweet_id (str): Идентификатор твита.
+        """
+        self.request_id = request_id
+        self.tweet_id = tweet_id
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.duration_ms = None
+        self.spans = []
+        self.thread_ids = {threading.get_ident()}
+        self.stacks = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str):
+        """
+        Замеряет время выполнения этапа.
+
+        Args:
+            name (str): Название этапа.
+        """
+        thread_id = threading.get_ident()
+        span = {"name": name, "start_ms": (time.perf_counter() - self.start) * 1000.0, "duration_ms": None}
+        with self._lock:
+            self.thread_ids.add(thread_id)
+            self.spans.append(span)
+        try:
+            yield span
+        finally:
+            span["duration_ms"] = (time.perf_counter() - self.start) * 1000.0 - span["start_ms"]
+
+    def finish(self) -> None:
+        """
+        Фиксирует общую длительность запроса.
+        """
+        self.duration_ms = (time.perf_counter() - self.start) * 1000.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Возвращает трассировку в виде словаря.
+
+        Незавершённые этапы (например, извлечение признаков, брошенное
+        по бюджету времени) возвращаются с duration_ms = None.
+
+        Returns:
+            Dict[str, Any]: Разбивка времени по этапам и, если есть, профиль стеков.
+        """
+        with self._lock:
+            spans = [dict(span) for span in self.spans]
+
+        trace = {
+            "request_id": self.request_id,
+            "tweet_id": self.tweet_id,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "spans": spans
+        }
+        if self.stacks is not None:
+            trace["stacks"] = self.stacks
+        return trace
+
+
+class StackSampler:
+    """
+    Сэмплирующий профилировщик стеков вызовов.
+
+    Фоновый поток с заданным интервалом снимает стеки потоков, участвующих
+    в обработке запроса, и подсчитывает их в свёрнутом формате
+    ("файл:функция;файл:функция"), совместимом с flame graph.
+    """
+
+    def __init__(self, trace: RequestTrace, interval: float, max_depth: int = 64):
+        """
+        Инициализирует сэмплер.
+
+        Args:
+            trace (RequestTrace): Трассировка, потоки которой нужно сэмплировать.
+            interval (float): Интервал между снимками в секундах.
+            max_depth (int, optional): Максимальная глубина стека. По умолчанию 64.
+        """
+        self.trace = trace
+        self.interval = interval
+        self.max_depth = max_depth
+        self.counts = Counter()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        """
+        Запускает сэмплирование.
+        """
+        self._thread.start()
+
+    def stop(self) -> Dict[str, int]:
+        """
+        Останавливает сэмплирование.
+
+        Returns:
+            Dict[str, int]: Количество снимков для каждого свёрнутого стека.
+        """
+        self._stop_event.set()
+        self._thread.join()
+        return dict(self.counts.most_common())
+
+    def _run(self) -> None:
+        """
+        Основной цикл сэмплера.
+        """
+        while not self._stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in list(self.trace.thread_ids):
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.counts[self._collapse(frame)] += 1
+
+    def _collapse(self, frame) -> str:
+        """
+        Сворачивает стек вызовов в строку.
+
+        Args:
+            frame: Верхний кадр стека.
+
+        Returns:
+            str: Стек от корня к вершине через ';'.
+        """
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{code.co_filename}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+
+class Profiler:
+    """
+    Управляет профилированием запросов.
+
+    Для каждого запроса собирает разбивку по этапам. Стеки вызовов снимаются,
+    если профилирование запрошено явно (заголовком, если его разрешил
+    администратор, или переключателем администратора) либо запрос попал
+    в низкочастотную выборку. Количество одновременно работающих сэмплеров
+    ограничено, остальные запросы профилируются только по этапам. Запросы,
+    превысившие порог длительности, сохраняются для получения через
+    административный эндпоинт.
+    """
+
+    def __init__(self):
+        """
+        Инициализирует профилировщик с настройками из конфигурации.
+        """
+        profiling_settings = config.get('profiling')
+        self.enabled = profiling_settings.get('enabled', False)
+        self.allow_profile_header = profiling_settings.get('allow_profile_header', False)
+        self.max_samplers = profiling_settings.get('max_samplers', 4)
+        self.sample_rate = profiling_settings.get('sample_rate', 0.01)
+        self.slow_threshold_ms = profiling_settings.get('slow_threshold_ms', 1000)
+        self.sampling_interval = profiling_settings.get('sampling_interval_ms', 5) / 1000.0
+        self.profiles = deque(maxlen=profiling_settings.get('max_profiles', 100))
+        self._samplers = {}
+        self._lock = threading.Lock()
+        memory_manager.register_cache("slow_profiles", self)
+
+        logger.info(
+            f"Инициализирован профилировщик. Профилирование всех запросов: {self.enabled}, "
+            f"доля выборки: {self.sample_rate}, порог медленного запроса: {self.slow_threshold_ms} мс"
+        )
+
+    def start_trace(self, request_id: str, tweet_id: str, force: bool = False) -> RequestTrace:
+        """
+        Начинает трассировку запроса.
+
+        Args:
+            request_id (str): Идентификатор запроса.
+            tweet_id (str): Идентификатор твита.
+            force (bool, optional): Принудительно снимать стеки вызовов. По умолчанию False.
+
+        Returns:
+            RequestTrace: Трассировка запроса.
+        """
+        trace = RequestTrace(request_id, tweet_id)
+
+        if not (force or self.enabled or random.random() < self.sample_rate):
+            return trace
+
+        with self._lock:
+            if len(self._samplers) >= self.max_samplers:
+                logger.debug(f"Достигнут лимит сэмплеров стеков ({self.max_samplers}). Request ID: {request_id}")
+                return trace
+            sampler = StackSampler(trace, self.sampling_interval)
+            self._samplers[request_id] = sampler
+        sampler.start()
+
+        return trace
+
+    def finish_trace(self, trace: RequestTrace) -> None:
+        """
+        Завершает трассировку запроса и сохраняет её, если запрос был медленным.
+
+        Args:
+            trace (RequestTrace): Трассировка запроса.
+        """
+        trace.finish()
+
+        with self._lock:
+            sampler = self._samplers.pop(trace.request_id, None)
+        if sampler is not None:
+            trace.stacks = sampler.stop()
+
+        if trace.duration_ms >= self.slow_threshold_ms:
+            logger.warning(
+                f"Медленный запрос: {trace.duration_ms:.1f} мс. "
+                f"Tweet ID: {trace.tweet_id}, Request ID: {trace.request_id}"
+            )
+            profile = trace.to_dict()
+            with self._lock:
+                self.profiles.append(profile)
+
+    def _snapshot_profiles(self) -> List[Dict[str, Any]]:
+        """
+        Возвращает копию списка профилей, безопасную для обхода.
+
+        Профили добавляются из потоков запросов и удаляются менеджером памяти,
+        поэтому обходить очередь напрямую нельзя.
+
+        Returns:
+            List[Dict[str, Any]]: Профили, от старых к новым.
+        """
+        with self._lock:
+            return list(self.profiles)
+
+    def memory_usage(self) -> int:
+        """
+        Оценивает объём памяти, занимаемый сохранёнными профилями.
+
+        Returns:
+            int: Оценка в байтах.
+        """
+        return deep_sizeof(self._snapshot_profiles())
+
+    def shrink(self, fraction: float) -> None:
+        """
+        Оставляет только самые новые профили.
+
+        Args:
+            fraction (float): Доля профилей, которую нужно сохранить.
+        """
+        with self._lock:
+            keep = int(len(self.profiles) * fraction)
+            while len(self.profiles) > keep:
+                self.profiles.popleft()
+
+    def configure(self, enabled: Optional[bool] = None, sample_rate: Optional[float] = None,
+                  slow_threshold_ms: Optional[float] = None,
+                  allow_profile_header: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Изменяет настройки профилирования во время работы сервиса.
+
+        Args:
+            enabled (bool, optional): Снимать стеки вызовов для всех запросов.
+            allow_profile_header (bool, optional): Учитывать заголовок X-Profile.
+            sample_rate (float, optional): Доля запросов, для которых снимаются стеки.
+            slow_threshold_ms (float, optional): Порог длительности медленного запроса в мс.
+
+        Returns:
+            Dict[str, Any]: Текущие настройки профилирования.
+        """
+        if enabled is not None:
+            self.enabled = enabled
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if slow_threshold_ms is not None:
+            self.slow_threshold_ms = slow_threshold_ms
+        if allow_profile_header is not None:
+            self.allow_profile_header = allow_profile_header
+
+        logger.info(
+            f"Изменены настройки профилирования. Профилирование всех запросов: {self.enabled}, "
+            f"доля выборки: {self.sample_rate}, порог медленного запроса: {self.slow_threshold_ms} мс, "
+            f"заголовок X-Profile: {'разрешён' if self.allow_profile_header else 'запрещён'}"
+        )
+        return self.get_settings()
+
+    def get_settings(self) -> Dict[str, Any]:
+        """
+        Возвращает текущие настройки профилирования.
+
+        Returns:
+            Dict[str, Any]: Настройки профилирования.
+        """
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "slow_threshold_ms": self.slow_threshold_ms,
+            "allow_profile_header": self.allow_profile_header,
+            "max_samplers": self.max_samplers
+        }
+
+    def get_profiles(self) -> List[Dict[str, Any]]:
+        """
+        Возвращает сохранённые профили медленных запросов.
+
+        Returns:
+            List[Dict[str, Any]]: Профили, от новых к старым.
+        """
+        return list(reversed(self._snapshot_profiles()))
+
+    def get_profile(self, request_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Возвращает профиль медленного запроса по его идентификатору.
+
+        Args:
+            request_id (str): Идентификатор запроса.
+
+        Returns:
+            Optional[Dict[str, Any]]: Профиль запроса или None, если он не найден.
+        """
+        for profile in self._snapshot_profiles():
+            if profile["request_id"] == request_id:
+                return profile
+        return None
+
+
+# Создаем глобальный экземпляр профилировщика
+profiler = Profiler()
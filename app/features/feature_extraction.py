@@ -4,6 +4,7 @@
 from typing import Dict, Any, List
 from tweet_features import FeaturePipeline, FeatureConfig
 from app.config.config import config
+from app.core.memory import memory_manager
 
 logger = config.logger
 
@@ -32,14 +33,26 @@ class FeatureExtractor:
         )
 
         # Инициализируем пайплайн извлечения признаков
-        self.feature_pipeline = FeaturePipeline(
-            config=tweet_features_settings,
-            use_structural=True,
-            use_text=True,
-            use_image=True,
-            use_emotional=True,
-            use_bert_embeddings=True
-        )
+        with memory_manager.track_component("feature_pipeline"):
+            self.feature_pipeline = FeaturePipeline(
+                config=tweet_features_settings,
+                use_structural=True,
+                use_text=True,
+                use_image=True,
+                use_emotional=True,
+                use_bert_embeddings=True
+            )
+
+        # Облегчённый пайплайн для деградированного режима: без загрузки изображений и BERT
+        with memory_manager.track_component("light_feature_pipeline"):
+            self.light_feature_pipeline = FeaturePipeline(
+                config=tweet_features_settings,
+                use_structural=True,
+                use_text=True,
+                use_image=False,
+                use_emotional=False,
+                use_bert_embeddings=False
+            )
 
         logger.info("Инициализирован экстрактор признаков с использованием tweet-features")
 
@@ -67,6 +80,32 @@ class FeatureExtractor:
             logger.error(f"Ошибка при извлечении признаков: {str(e)}")
             raise Exception(f"Ошибка при извлечении признаков: {str(e)}")
 
+    def extract_light_features(self, tweet_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Извлекает только структурные и лёгкие текстовые признаки твита.
+
+        Используется в деградированном режиме, когда полный набор признаков
+        не удаётся получить в рамках бюджета времени.
+
+        Args:
+            tweet_data (Dict[str, Any]): Данные твита.
+
+        Returns:
+            Dict[str, Any]: Извлечённые признаки.
+
+        Raises:
+            Exception: Если возникла ошибка при извлечении признаков.
+        """
+        logger.info(f"Извлечение облегчённого набора признаков для твита с ID: {tweet_data.get('id')}")
+
+        try:
+            features = self.light_feature_pipeline.extract_single(tweet_data)
+            logger.debug(f"Извлечено {len(features)} признаков облегчённого набора")
+            return features
+        except Exception as e:
+            logger.error(f"Ошибка при извлечении облегчённого набора признаков: {str(e)}")
+            raise Exception(f"Ошибка при извлечении облегчённого набора признаков: {str(e)}")
+
     def get_feature_names(self) -> List[str]:
         """
         Возвращает список всех имен признаков, извлекаемых пайплайном.
@@ -20,7 +20,7 @@ def main():
 
     # Запускаем сервис
     uvicorn.run(
-        "app.api:app",
+        "app.api.server:app",
         host=host,
         port=port,
         reload=debug,
@@ -2,7 +2,7 @@
 Модуль с вспомогательными функциями для tweet-inference-service.
 """
 import uuid
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 from app.config.config import config
 
@@ -58,6 +58,27 @@ def validate_tweet_data(tweet_data: Dict[str, Any]) -> bool:
     return True
 
 
+def validate_thresholds(thresholds: Optional[List[float]]) -> bool:
+    """
+    Проверяет, что пороговые значения находятся в диапазоне [0, 1].
+
+    Args:
+        thresholds (List[float], optional): Пороговые значения.
+
+    Returns:
+        bool: True, если пороги не заданы или все валидны, иначе False.
+    """
+    if not thresholds:
+        return True
+
+    invalid = [t for t in thresholds if not 0.0 <= t <= 1.0]
+    if invalid:
+        logger.warning(f"Недопустимые пороговые значения: {invalid}")
+        return False
+
+    return True
+
+
 def format_error_response(message: str, status_code: int = 400) -> Dict[str, Any]:
     """
     Форматирует ответ с ошибкой.
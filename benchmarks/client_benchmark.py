@@ -0,0 +1,203 @@
+"""
+Бенчмарк сквозной пропускной способности клиента tweet-inference-service.
+
+Сравнивает ad-hoc вызовы (новое соединение и один твит на запрос),
+одиночные запросы через пул соединений в JSON и msgpack, а также
+асинхронный клиент с пакетированием в JSON и msgpack.
+Сервис должен быть запущен заранее:
+
+    python -m app.main
+    python -m benchmarks.client_benchmark --url http://localhost:8000 --requests 500
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, Any, List
+
+import httpx
+import msgpack
+import numpy as np
+
+from app.client import TweetInferenceClient
+
+
+def make_tweets(count: int) -> List[Dict[str, Any]]:
+    """
+    Формирует набор тестовых твитов.
+
+    Args:
+        count (int): Количество твитов.
+
+    Returns:
+        List[Dict[str, Any]]: Данные твитов.
+    """
+    return [
+        {
+            "id": str(1889728050276823115 + i),
+            "created_at": "2025-02-12 17:27:31.000000 +00:00",
+            "text": f"Пример текста твита номер {i}",
+            "tweet_type": "SINGLE",
+            "image_url": None,
+            "quoted_text": None
+        }
+        for i in range(count)
+    ]
+
+
+def summarize(name: str, elapsed: float, latencies: List[float]) -> Dict[str, Any]:
+    """
+    Формирует сводку по результатам прогона.
+
+    Args:
+        name (str): Название сценария.
+        elapsed (float): Общее время прогона в секундах.
+        latencies (List[float]): Задержки отдельных вызовов в секундах.
+
+    Returns:
+        Dict[str, Any]: Пропускная способность и перцентили задержки.
+    """
+    latencies_ms = np.asarray(latencies) * 1000.0
+    return {
+        "scenario": name,
+        "requests": len(latencies),
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99))
+    }
+
+
+async def run_naive(url: str, tweets: List[Dict[str, Any]], concurrency: int) -> Dict[str, Any]:
+    """
+    Отправляет каждый твит отдельным запросом через новое соединение.
+
+    Args:
+        url (str): Адрес сервиса.
+        tweets (List[Dict[str, Any]]): Данные твитов.
+        concurrency (int): Количество одновременных запросов.
+
+    Returns:
+        Dict[str, Any]: Сводка по прогону.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def call(tweet):
+        async with semaphore:
+            start = time.perf_counter()
+            async with httpx.AsyncClient(timeout=60.0) as http:
+                response = await http.post(f"{url}/api/predict", json=tweet)
+                response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(call(tweet) for tweet in tweets))
+    return summarize("naive", time.perf_counter() - start, latencies)
+
+
+async def run_pooled(url: str, tweets: List[Dict[str, Any]], concurrency: int, use_msgpack: bool) -> Dict[str, Any]:
+    """
+    Отправляет каждый твит отдельным запросом через общий пул соединений.
+
+    Args:
+        url (str): Адрес сервиса.
+        tweets (List[Dict[str, Any]]): Данные твитов.
+        concurrency (int): Количество одновременных запросов.
+        use_msgpack (bool): Использовать msgpack вместо JSON.
+
+    Returns:
+        Dict[str, Any]: Сводка по прогону.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    headers = {"Content-Type": "application/msgpack", "Accept": "application/msgpack"}
+
+    async with httpx.AsyncClient(timeout=60.0) as http:
+        async def call(tweet):
+            async with semaphore:
+                start = time.perf_counter()
+                if use_msgpack:
+                    response = await http.post(f"{url}/api/predict", content=msgpack.packb(tweet), headers=headers)
+                    response.raise_for_status()
+                    msgpack.unpackb(response.content)
+                else:
+                    response = await http.post(f"{url}/api/predict", json=tweet)
+                    response.raise_for_status()
+                    response.json()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(call(tweet) for tweet in tweets))
+        elapsed = time.perf_counter() - start
+
+    return summarize(f"pooled-{'msgpack' if use_msgpack else 'json'}", elapsed, latencies)
+
+
+async def run_client(url: str, tweets: List[Dict[str, Any]], concurrency: int, batch_size: int,
+                     use_msgpack: bool = False) -> Dict[str, Any]:
+    """
+    Отправляет твиты через асинхронный клиент с пакетированием.
+
+    Args:
+        url (str): Адрес сервиса.
+        tweets (List[Dict[str, Any]]): Данные твитов.
+        concurrency (int): Размер пула соединений.
+        batch_size (int): Размер пакета.
+        use_msgpack (bool, optional): Использовать msgpack вместо JSON. По умолчанию False.
+
+    Returns:
+        Dict[str, Any]: Сводка по прогону.
+    """
+    latencies = []
+
+    async with TweetInferenceClient(url, batch_size=batch_size, max_connections=concurrency,
+                                    use_msgpack=use_msgpack) as client:
+        async def call(tweet):
+            start = time.perf_counter()
+            await client.predict(tweet)
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(call(tweet) for tweet in tweets))
+        elapsed = time.perf_counter() - start
+
+    return summarize(f"client-{'msgpack' if use_msgpack else 'json'}(batch={batch_size})", elapsed, latencies)
+
+
+async def main(args: argparse.Namespace) -> None:
+    """
+    Запускает сценарии бенчмарка и выводит результаты.
+
+    Args:
+        args (argparse.Namespace): Аргументы командной строки.
+    """
+    tweets = make_tweets(args.requests)
+
+    # Прогрев сервиса
+    await run_client(args.url, tweets[:args.batch_size], args.concurrency, args.batch_size)
+
+    results = [
+        await run_naive(args.url, tweets, args.concurrency),
+        await run_pooled(args.url, tweets, args.concurrency, use_msgpack=False),
+        await run_pooled(args.url, tweets, args.concurrency, use_msgpack=True),
+        await run_client(args.url, tweets, args.concurrency, args.batch_size),
+        await run_client(args.url, tweets, args.concurrency, args.batch_size, use_msgpack=True)
+    ]
+
+    print(f"{'scenario':<28}{'requests':>10}{'rps':>12}{'p50, ms':>12}{'p99, ms':>12}")
+    for result in results:
+        print(
+            f"{result['scenario']:<28}{result['requests']:>10}{result['throughput_rps']:>12.1f}"
+            f"{result['p50_ms']:>12.1f}{result['p99_ms']:>12.1f}"
+        )
+    baseline = results[0]['throughput_rps']
+    for result in results[1:]:
+        print(f"Ускорение {result['scenario']}: {result['throughput_rps'] / baseline:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк клиента tweet-inference-service")
+    parser.add_argument("--url", default="http://localhost:8000", help="Адрес сервиса")
+    parser.add_argument("--requests", type=int, default=500, help="Количество твитов")
+    parser.add_argument("--concurrency", type=int, default=16, help="Количество одновременных запросов")
+    parser.add_argument("--batch-size", type=int, default=32, help="Размер пакета клиента")
+    asyncio.run(main(parser.parse_args()))
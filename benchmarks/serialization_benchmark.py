@@ -0,0 +1,72 @@
+"""
+Бенчмарк сериализации ответа /api/predict/batch в JSON и msgpack.
+
+Не требует запущенного сервиса:
+
+    python -m benchmarks.serialization_benchmark --batch-size 32
+"""
+import argparse
+import json
+import timeit
+from typing import Dict, Any
+
+import msgpack
+
+
+def make_response(batch_size: int) -> Dict[str, Any]:
+    """
+    Формирует ответ пакетного предсказания.
+
+    Args:
+        batch_size (int): Количество твитов в пакете.
+
+    Returns:
+        Dict[str, Any]: Ответ в формате BatchPredictionResponse.
+    """
+    results = []
+    for i in range(batch_size):
+        tweet_id = str(1889728050276823115 + i)
+        results.append({
+            "tweet_id": tweet_id,
+            "prediction": {
+                "request_id": "0b7f5c0e-4c8e-4a41-9a43-7c1f5e6b2d11",
+                "tweet_id": tweet_id,
+                "probability": 0.4213,
+                "degraded": False,
+                "classifications": [{"threshold": 0.5, "label": 0}]
+            }
+        })
+    return {"results": results}
+
+
+def main(args: argparse.Namespace) -> None:
+    """
+    Измеряет размер и время кодирования и декодирования ответа.
+
+    Args:
+        args (argparse.Namespace): Аргументы командной строки.
+    """
+    body = make_response(args.batch_size)
+    json_bytes = json.dumps(body).encode()
+    msgpack_bytes = msgpack.packb(body, use_bin_type=True)
+
+    formats = [
+        ("json", lambda: json.dumps(body).encode(), lambda: json.loads(json_bytes), json_bytes),
+        ("msgpack", lambda: msgpack.packb(body, use_bin_type=True),
+         lambda: msgpack.unpackb(msgpack_bytes, raw=False), msgpack_bytes),
+    ]
+
+    print(f"{'format':<10}{'bytes':>10}{'encode, us':>14}{'decode, us':>14}")
+    for name, encode, decode, data in formats:
+        # Минимум по сериям меньше всего зависит от фоновой нагрузки
+        encode_us = min(timeit.repeat(encode, number=args.number, repeat=args.repeat)) / args.number * 1e6
+        decode_us = min(timeit.repeat(decode, number=args.number, repeat=args.repeat)) / args.number * 1e6
+        print(f"{name:<10}{len(data):>10}{encode_us:>14.1f}{decode_us:>14.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк сериализации ответа tweet-inference-service")
+    parser.add_argument("--batch-size", type=int, default=32, help="Количество твитов в ответе")
+    parser.add_argument("--number", type=int, default=20000, help="Количество повторов в серии")
+    parser.add_argument("--repeat", type=int, default=3, help="Количество серий")
+    main(parser.parse_args())
@@ -0,0 +1,86 @@
+"""
+Сервер-заглушка для измерения транспортных накладных расходов.
+
+Использует те же маршруты с поддержкой msgpack (MsgpackRoute) и схемы
+app.api.schemas, что и сервис, но вместо извлечения признаков и модели
+возвращает постоянный ответ. Не загружает конфигурацию, модели и
+пакет tweet-features, поэтому запускается без них:
+
+    python -m benchmarks.stub_server --port 8765
+    python -m benchmarks.client_benchmark --url http://localhost:8765 --requests 2000
+"""
+import argparse
+from typing import Dict, Any, List, Optional
+
+from fastapi import APIRouter, Body, FastAPI, Query
+
+from app.api.schemas import TweetInput, PredictionResponse, BatchPredictionResponse
+from app.api.transport import MsgpackRoute
+
+router = APIRouter(route_class=MsgpackRoute)
+
+
+def make_prediction(tweet: TweetInput) -> Dict[str, Any]:
+    """
+    Формирует постоянный результат предсказания.
+
+    Args:
+        tweet (TweetInput): Данные твита.
+
+    Returns:
+        Dict[str, Any]: Результат в формате PredictionResponse.
+    """
+    return {
+        "request_id": "00000000-0000-0000-0000-000000000000",
+        "tweet_id": tweet.id,
+        "probability": 0.42,
+        "degraded": False,
+        "classifications": [{"threshold": 0.5, "label": 0}]
+    }
+
+
+@router.post("/predict", response_model=PredictionResponse, response_model_exclude_none=True)
+def predict(tweet: TweetInput = Body(...)):
+    """
+    Возвращает постоянный результат для одного твита.
+
+    Args:
+        tweet (TweetInput): Данные твита.
+
+    Returns:
+        PredictionResponse: Результат предсказания.
+    """
+    return make_prediction(tweet)
+
+
+@router.post("/predict/batch", response_model=BatchPredictionResponse, response_model_exclude_none=True)
+def predict_batch(tweets: List[Dict[str, Any]] = Body(...), threshold: Optional[List[float]] = Query(None)):
+    """
+    Возвращает постоянные результаты для пакета твитов с проверкой каждого твита.
+
+    Args:
+        tweets (List[Dict[str, Any]]): Данные твитов.
+        threshold (List[float], optional): Пороговые значения (не используются).
+
+    Returns:
+        BatchPredictionResponse: Результаты в порядке входных твитов.
+    """
+    results = []
+    for item in tweets:
+        tweet = TweetInput.model_validate(item)
+        results.append({"tweet_id": tweet.id, "prediction": make_prediction(tweet)})
+    return {"results": results}
+
+
+app = FastAPI(title="Tweet Inference Service (stub)")
+app.include_router(router, prefix="/api")
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Сервер-заглушка для бенчмарка транспорта")
+    parser.add_argument("--host", default="127.0.0.1", help="Адрес")
+    parser.add_argument("--port", type=int, default=8765, help="Порт")
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")